@@ -1,12 +1,24 @@
 # frontend/app.py
 import streamlit as st
-import plotly.graph_objects as go
 import json
-import openai
 from utils import create_mindmap_figure
+from layout import depth_for_budget, radial_layout, visible_rows
+import ocr
+import tracing
+from extraction import extract_files
+from video import cached_transcript, transcribe_video_url
+from generation import SectionedMindmap, stream_mindmap, stream_sections
+from graph import MindMap, MindMapError
+from mapfile import EXTENSION, MIME_TYPE, dump_mindmap, load_mindmap
+from cache import content_key
+from jobs import DONE, FAILED, job_queue
+from export import FORMATS, cached_export, create_directory_from_mindmap, export_figure, mindmap_key, \
+    zip_mindmap_directories
 import platform
 import getpass
+import itertools
 import os
+import time
 
 # import subprocess
 # password = "appuser"
@@ -26,38 +38,77 @@ import os
 #     text=True,              # Treat stdin/stdout as text
 # )
 
-def create_directory_from_mindmap(graph_data, base_path):
-    if not os.path.exists(base_path):
-        os.makedirs(base_path)
-    
-    # Create a mapping of node IDs to their full paths
-    node_paths = {}
-    nodes = {node['id']: node['label'] for node in graph_data['nodes']}
-    
-    # First, handle the root node
-    root_node = next(node for node in graph_data['nodes'] if node['id'] == 'root')
-    root_path = os.path.join(base_path, root_node['label'])
-    node_paths['root'] = root_path
-    os.makedirs(root_path, exist_ok=True)
-    
-    # Process all edges to create directory structure
-    for edge in graph_data['edges']:
-        from_node = edge['from']
-        to_node = edge['to']
-        
-        # If parent path is known
-        if from_node in node_paths:
-            parent_path = node_paths[from_node]
-            child_name = nodes[to_node]
-            child_path = os.path.join(parent_path, child_name)
-            node_paths[to_node] = child_path
-            os.makedirs(child_path, exist_ok=True)
-    
-    return root_path
+# Seconds between polls of a background job, and so between redraws of a
+# mind map that is still streaming in
+POLL_INTERVAL = 0.5
+# Larger maps open in a level-of-detail view showing about this many nodes
+DETAIL_NODE_BUDGET = 150
+# Hard cap on the nodes drawn in a level-of-detail view, whatever is expanded
+MAX_DRAWN_NODES = 1500
+# Most recent pipeline stages listed in the debug panel
+DEBUG_PANEL_SPANS = 50
+
+
+def wait_for_job(job_id, progress_bar=None, on_partial=None):
+    """
+    Poll a background job until it finishes.
+
+    A widget interaction stops this loop by rerunning the script, but not
+    the job; the next run finds the job id in session state and resumes
+    polling.
+
+    Args:
+        job_id (str): Id returned by ``job_queue.submit``
+        progress_bar: Optional ``st.progress`` element to update
+        on_partial (callable): Called with each new intermediate result
+
+    Returns:
+        jobs.Job: The finished job, or None if it expired or the server restarted
+    """
+    job = job_queue.get(job_id)
+    partial = None
+    while job is not None and not job.finished:
+        if progress_bar is not None:
+            progress_bar.progress(job.progress, text=job.message)
+        if on_partial is not None and job.partial is not partial:
+            partial = job.partial
+            on_partial(partial)
+        time.sleep(POLL_INTERVAL)
+    traced_jobs = st.session_state.setdefault("traced_jobs", set())
+    if job is not None and job.id not in traced_jobs:
+        traced_jobs.add(job.id)
+        run_spans.extend(job.spans)
+    return job
+
+
+def generate_mindmap_job(job, text, deterministic):
+    """Background task streaming a mind map; partial maps are published for previews."""
+    job.report(0.0, "Generating mind map...")
+    graph_data = None
+    for graph_data in stream_mindmap(text, deterministic=deterministic):
+        job.publish(graph_data)
+    return MindMap.from_dict(graph_data)
+
+
+def generate_sections_job(job, text, deterministic, previous):
+    """Background task regenerating only the sections that changed since ``previous``."""
+    job.report(0.0, "Generating changed sections...")
+    sectioned = None
+    for sectioned in stream_sections(text, previous=previous, deterministic=deterministic):
+        job.report(len(sectioned.partials) / max(1, len(set(sectioned.sections))))
+        job.publish(sectioned.graph)
+    return sectioned
+
+
+# Time every pipeline stage of this run for the debug panel and trace outputs
+run_spans = tracing.start_collecting()
 
+# Configure OpenAI API key; the client picks it up when it is first imported
+os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
 
-# Configure OpenAI API key
-openai.api_key = st.secrets["OPENAI_API_KEY"]
+# Start loading the OCR model before the first image arrives
+if ocr.WARM_UP_AT_STARTUP:
+    ocr.start_warm_up()
 
 # Page configuration
 st.set_page_config(
@@ -194,7 +245,7 @@ st.title("⚡︎ LightningRoute: AI-Powered **Mind Mapping** ⚡︎")
 
 # File upload and text input section
 st.subheader("Input Options")
-input_type = st.radio("Choose input type:", ["Text Input", "File Upload", "Video URL"])
+input_type = st.radio("Choose input type:", ["Text Input", "File Upload", "Video URL", "Mind Map File"])
 
 # Directory creation options
 st.subheader("Directory Creation Options")
@@ -215,215 +266,294 @@ if input_type == "Text Input":
         help="Paste your text here to generate a mind map"
     )
 elif input_type == "File Upload":
-    uploaded_file = st.file_uploader("Choose a file", type=["txt", "docx", "doc", "pdf", "png", "jpg", "jpeg", "mp3", "mp4"])
+    uploaded_files = st.file_uploader("Choose files", type=["txt", "docx", "doc", "pdf", "png", "jpg", "jpeg", "mp3", "mp4"],
+                                      accept_multiple_files=True,
+                                      help="Several files are combined into one mind map, in file name order")
     st.caption("If you upload an image, the text will be extracted using OCR.")
     st.caption("Please note that it may take a few minutes for Streamlit cloud to load the model of EasyOCR.")
     st.caption("If you encounter a File Not Found Error (Or similar), please wait a few minutes and retry. If the error persists, contact us at https://github.com/Unknownuserfrommars/LightningRoute-Frontend/issues/")
-    if uploaded_file is not None:
-        try:
-            file_extension = os.path.splitext(uploaded_file.name)[1].lower()
-            if uploaded_file.type == "text/plain":
-                text_input = uploaded_file.getvalue().decode()
-            elif uploaded_file.type == "application/pdf":
-                import PyPDF2
-                import io
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.getvalue()))
-                text_input = ""
-                for page in pdf_reader.pages:
-                    text_input += page.extract_text()
-            elif "word" in uploaded_file.type:
-                from docx import Document
-                import io
-                doc = Document(io.BytesIO(uploaded_file.getvalue()))
-                text_input = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            elif uploaded_file.type.startswith("image/"):
-                import easyocr
-                import numpy as np
-                from PIL import Image
-                import io
-                image = Image.open(io.BytesIO(uploaded_file.getvalue()))
-                image_np = np.array(image)
-                reader = easyocr.Reader(['en', 'ch_sim'], gpu=False)
-                results = reader.readtext(image_np)
-                text_lines = [item[1] for item in results]
-                text_input = "\n".join(text_lines)
-            elif uploaded_file.name.endswith(".mp3"):
-                import speech_recognition as sr
-                import io
-                r = sr.Recognizer()
-                audio = sr.AudioFile(io.BytesIO(uploaded_file.getvalue()))
-                with audio as source:
-                    audio_text = r.record(source)
-                    text_input = r.recognize_google(audio_text)
-            elif uploaded_file.name.endswith(".mp4"):
-                import speech_recognition as sr
-                import moviepy.editor as mp
-                import io
-                video = mp.VideoFileClip(uploaded_file.name)
-                audio_f = video.audio
-                audio_f.write_audiofile("temp_audio.mp3")
-                r = sr.Recognizer()
-                with sr.AudioFile("temp_audio.mp3") as source: 
-                    data = r.record(source)
-                text_input = r.recognize_google(data)
-        except Exception as e:
-            st.error(f"Error reading file: {str(e)}")
+    if uploaded_files:
+        # Reruns with the same files find the same job instead of extracting
+        # again; getbuffer() shares the uploads' memory instead of copying it
+        files = [(uploaded_file.getbuffer(), uploaded_file.name, uploaded_file.type or "")
+                 for uploaded_file in uploaded_files]
+        job_id = job_queue.submit(
+            content_key('extract', *(part for file in files for part in (file[1], file[2], file[0]))),
+            lambda job, files=files: extract_files(files, progress=job.report)
+        )
+        with st.spinner("Extracting text..."):
+            progress_bar = st.progress(0.0)
+            job = wait_for_job(job_id, progress_bar)
+            progress_bar.empty()
+        if job is not None and job.status == DONE:
+            text_input = job.result
+        elif job is not None:
+            st.error(f"Error reading file: {str(job.error)}")
+elif input_type == "Mind Map File":
+    map_upload = st.file_uploader("Choose a mind map file", type=[EXTENSION, "json"],
+                                  help=f"A .{EXTENSION} file or a mind map downloaded as JSON from LightningRoute")
+    if map_upload is not None:
+        map_data = map_upload.getbuffer()
+        map_key = content_key('mapfile', map_data)
+        # Open each upload once; later reruns keep the view state
+        if st.session_state.get("imported_map") != map_key:
+            try:
+                loaded = load_mindmap(map_data)
+            except MindMapError as e:
+                st.error(f"Error reading mind map file: {str(e)}")
+            else:
+                # The stored layout is used as is; nothing is generated or laid out
+                st.session_state.imported_map = map_key
+                st.session_state.mindmap = loaded.mindmap
+                st.session_state.mindmap_layout = loaded.layout
+                st.session_state.layout_for = loaded.mindmap
+                st.session_state.expanded_nodes = set()
+                st.session_state.clicked_nodes = set()
+                st.session_state.pop("mindmap_sections", None)
 else:
     video_url = st.text_area(
         "Enter your video URL",
         height=100,
         help="MUST BE FULL URL!!!"
     )
-    try:
-        import yt_dlp
-        from pydub import AudioSegment
-        import speech_recognition as sr
-        ydl_opts = {
-        'format': 'bestaudio/best',
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
-        }],
-        'outtmpl': 'audio'
-        }
-        # import shutil
-
-        # ffmpeg_path = shutil.which("ffmpeg")
-        # ffprobe_path = shutil.which("ffprobe")
-        # st.text(ffmpeg_path)
-        # st.text(ffprobe_path)
-    
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([video_url])
-        
-        audio_download_path = os.path.join(os.getcwd(), 'audio.mp3')
-        audio = AudioSegment.from_file(audio_download_path, format="mp3")
-        wav_path = audio_download_path.replace(".mp3", ".wav")
-        audio.export(wav_path, format="wav")
-        recognizer = sr.Recognizer()
-
-        with sr.AudioFile(wav_path) as source:
-            print("🔊 Extracting audio...")
-            audio_data = recognizer.record(source)
-
-            try:
-                print("📝 Converting audio to text...")
-                text_input = recognizer.recognize_google(audio_data)
-            except sr.UnknownValueError:
-                raise ValueError("Cannot recognize the audio")
-            except sr.RequestError:
-                raise ConnectionError("Unable to connect Google API")
-
-        # Optional cleanup
-        if os.path.exists(audio_download_path):
-            os.remove(audio_download_path)
-        if os.path.exists(wav_path):
-            os.remove(wav_path)
-
-    except Exception as e:
-        st.error(f"Error reading video: {repr(e)}")
+    video_url = video_url.strip()
+    transcripts = st.session_state.setdefault("video_transcripts", {})
+    video_jobs = st.session_state.setdefault("video_jobs", {})
+    if video_url:
+        text_input = transcripts.get(video_url) or cached_transcript(video_url) or ""
+        if text_input:
+            st.caption("Transcript ready.")
+        else:
+            if st.button("Transcribe Video"):
+                video_jobs[video_url] = job_queue.submit(
+                    content_key('video', video_url),
+                    lambda job, url=video_url: transcribe_video_url(url, progress=job.report, work_dir=job.work_dir)
+                )
+            if video_url in video_jobs:
+                progress_bar = st.progress(0.0, text="Starting...")
+                job = wait_for_job(video_jobs[video_url], progress_bar)
+                progress_bar.empty()
+                del video_jobs[video_url]
+                if job is None:
+                    st.warning("The transcription was interrupted. Please try again.")
+                elif job.status == DONE:
+                    text_input = job.result
+                else:
+                    st.error(f"Error reading video: {repr(job.error)}")
+        if text_input:
+            transcripts[video_url] = text_input
 
 col1, col2 = st.columns([3,10])
+deterministic = col2.checkbox(
+    "Deterministic output",
+    help="Always produce the same mind map for the same text (temperature 0)"
+)
+incremental = col2.checkbox(
+    "Incremental updates",
+    help="Split the text into sections and only regenerate the sections that changed since the last mind map"
+)
+chart_title = st.empty()
+chart = st.empty()
 # Process button
 if col1.button("Generate Mind Map"):
-    if text_input:
-        with st.spinner("Generating mind map..."):
-            try:
-                # Call OpenAI API to process the text and generate mind map structure
-                prompt = f"""Given the following text, create a mind map structure. Extract key concepts and their relationships.
-                Format the response as a JSON with two arrays:
-                1. 'nodes': Each node has 'id' (unique string) and 'label' (displayed text)
-                2. 'edges': Each edge has 'from' and 'to' node IDs showing relationships
-                Root node should have id 'root'. Example format:
-                {{
-                    "nodes": [{{"id": "root", "label": "Main Topic"}}, {{"id": "1", "label": "Subtopic"}}],
-                    "edges": [{{"from": "root", "to": "1"}}]
-                }}
-                
-                Text to analyze:
-                {text_input}
-                """
-                # TODO: Add option for "New learners" and "Experienced learners" to the button
-                response = openai.ChatCompletion.create(
-                    model="gpt-4o",
-                    messages=[{
-                        "role": "system",
-                        "content": "You are a mind map generator that converts text into structured mind maps."
-                    }, {
-                        "role": "user",
-                        "content": prompt
-                    }],
-                    temperature=0.7,
-                    max_tokens=2000
-                )
-                
-                # Extract and parse the JSON response
-                try:
-                    gpt_response = response.choices[0].message.content
-                    # Debug: Show GPT's raw response
-                    # st.subheader("Debug: GPT Response")
-                    # st.text(gpt_response)
-                    #print(gpt_response)
-                    
-                    # Parse the JSON response
-                    gpt_response_trimmed = gpt_response.strip().replace("```json", "").replace("```", "").strip()
-                    graph_data = json.loads(gpt_response_trimmed)
-                except Exception as e:
-                    st.error(f"An error has occured while GPT is responding: {e}")
-                # Debug: Print raw text input
-                # st.subheader("Debug: Input Text")
-                # st.text_area("Raw Text Input", text_input, height=100)
-                
-                # Debug: Print graph data
-                # st.subheader("Debug: Graph Data")
-                # st.json(graph_data)
-                
-                # Create and display mind map
-                st.subheader("Mind Map Visualization")
-                fig = create_mindmap_figure(graph_data)
-                fig.update_layout(font=dict(family="Noto Sans CJK", size=12, color="black"))
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Add download button for the mind map
-                st.download_button(
-                    "Download Mindmap as JSON",
-                    data=json.dumps(graph_data),
-                    file_name="mindmap.json",
-                    mime="application/json"
-                )
+    # Whitespace-only input normalizes to nothing to send to the model
+    if text_input.strip():
+        # Call OpenAI API to process the text and generate mind map structure
+        # TODO: Add option for "New learners" and "Experienced learners" to the button
+        if incremental:
+            previous = st.session_state.get("mindmap_sections")
+            st.session_state.mindmap_job = job_queue.submit(
+                content_key('mindmap-sections', str(deterministic), text_input,
+                            *(previous.sections if previous is not None else ())),
+                lambda job, text=text_input, deterministic=deterministic, previous=previous:
+                    generate_sections_job(job, text, deterministic, previous)
+            )
+        else:
+            st.session_state.mindmap_job = job_queue.submit(
+                content_key('mindmap', str(deterministic), text_input),
+                lambda job, text=text_input, deterministic=deterministic: generate_mindmap_job(job, text, deterministic)
+            )
+    else:
+        st.warning("Please enter some text or upload a file to generate a mind map.")
 
-                img_bytes = fig.to_image(format="png")
-                st.download_button(
-                label="Download Mindmap as PNG",
-                data=img_bytes,
-                file_name="plotly_chart.png",
-                mime="image/png"
-                )
-                
-                if create_dir == "Yes":
-                    try:
-                        # Expand the path if it contains ~
-                        expanded_path = os.path.expanduser(dir_path)
-                        # Create directory structure
-                        root_dir = create_directory_from_mindmap(graph_data, expanded_path)
-                        st.success(f"Successfully created directory structure at: {root_dir}")
-                    except Exception as e:
-                        st.error(f"Error creating directory structure: {str(e)}")
+if "mindmap_job" in st.session_state:
+    preview_keys = itertools.count()
+
+    def show_preview(graph_data):
+        # Redraw the partial map as nodes and edges stream in
+        if any(node.get('id') == 'root' for node in graph_data['nodes']):
+            chart.plotly_chart(create_mindmap_figure(graph_data), use_container_width=True,
+                               key=f"mindmap-preview-{next(preview_keys)}")
+
+    with st.spinner("Generating mind map..."):
+        chart_title.subheader("Mind Map Visualization")
+        job = wait_for_job(st.session_state.mindmap_job, on_partial=show_preview)
+    del st.session_state.mindmap_job
+    if job is None:
+        st.warning("Mind map generation was interrupted. Please generate again.")
+    elif job.status == FAILED:
+        st.error(f"An error has occured while GPT is responding: {job.error}")
+    else:
+        mindmap = job.result
+        if isinstance(mindmap, SectionedMindmap):
+            st.session_state.mindmap_sections = mindmap
+            sections = len(set(mindmap.sections))
+            st.caption(f"Regenerated {len(mindmap.regenerated)} of {sections} section(s)")
+            mindmap = MindMap.from_dict(mindmap.graph)
+        # Keep the map across reruns so exports can be prepared on demand
+        st.session_state.mindmap = mindmap
+
+        # Debug: Print raw text input
+        # st.subheader("Debug: Input Text")
+        # st.text_area("Raw Text Input", text_input, height=100)
+
+        if create_dir == "Yes":
+            try:
+                # Expand the path if it contains ~
+                expanded_path = os.path.expanduser(dir_path)
+                # Create directory structure
+                root_dir = create_directory_from_mindmap(mindmap, expanded_path)
+                st.success(f"Successfully created directory structure at: {root_dir}")
             except Exception as e:
-                st.error(f"An error occurred: {str(e)}")
+                st.error(f"Error creating directory structure: {str(e)}")
+
+mindmap = st.session_state.get("mindmap")
+if mindmap is not None:
+    if mindmap.warnings:
+        with st.expander(f"Fixed {len(mindmap.warnings)} problem(s) in the generated mind map"):
+            st.markdown("\n".join(f"- {warning}" for warning in mindmap.warnings))
+
+    # The whole map is laid out once; level-of-detail views only choose
+    # which of its nodes to draw
+    if st.session_state.get("layout_for") is not mindmap:
+        st.session_state.mindmap_layout = radial_layout(mindmap)
+        st.session_state.layout_for = mindmap
+        # Node ids of unchanged sections survive incremental updates, and
+        # so do the subtrees expanded under them
+        st.session_state.expanded_nodes = {node_id for node_id in st.session_state.get("expanded_nodes", ())
+                                           if node_id in st.session_state.mindmap_layout.index}
+        st.session_state.clicked_nodes = set()
+    layout = st.session_state.mindmap_layout
+    expanded = st.session_state.expanded_nodes
+    detailed = len(layout.ids) > DETAIL_NODE_BUDGET
+
+    # Create and display mind map
+    chart_title.subheader("Mind Map Visualization")
+    if detailed:
+        deepest = int(layout.depth[-1])
+        max_depth = deepest if deepest == 1 else st.slider(
+            "Detail level", 1, deepest, value=depth_for_budget(layout, DETAIL_NODE_BUDGET),
+            help="Deepest level shown. Click a node with a (+N) badge to expand or collapse it."
+        )
+        # A click selects a node; only newly selected nodes are toggled
+        chart_state = st.session_state.get("mindmap-chart") or {}
+        points = chart_state.get("selection", {}).get("points", [])
+        clicked = {point.get("customdata") for point in points} - {None}
+        # Only nodes with hidden children, or nodes expanded already, toggle;
+        # expanding any other node would change nothing until the slider moves
+        rows, hidden = visible_rows(layout, max_depth, expanded, MAX_DRAWN_NODES)
+        toggleable = {layout.ids[row] for row in rows[hidden > 0].tolist()} | expanded
+        expanded.symmetric_difference_update((clicked - st.session_state.clicked_nodes) & toggleable)
+        st.session_state.clicked_nodes = clicked
+        fig = create_mindmap_figure(mindmap, layout, max_depth=max_depth, expanded=expanded,
+                                    max_nodes=MAX_DRAWN_NODES)
     else:
-        st.warning("Please enter some text or upload a file to generate a mind map.")
+        fig = create_mindmap_figure(mindmap, layout)
+    fig.update_layout(font=dict(family="Noto Sans CJK", size=12, color="black"))
+    if detailed:
+        try:
+            chart.plotly_chart(fig, use_container_width=True, key="mindmap-chart", on_select="rerun",
+                               selection_mode="points")
+        except TypeError:
+            # Streamlit before 1.35 has no chart selections; the slider still works
+            chart.plotly_chart(fig, use_container_width=True)
+    else:
+        chart.plotly_chart(fig, use_container_width=True)
+
+    # Add download button for the mind map
+    st.download_button(
+        "Download Mindmap as JSON",
+        data=json.dumps(mindmap.to_dict()),
+        file_name="mindmap.json",
+        mime="application/json"
+    )
+    if st.session_state.get("mindmap_file_for") is not mindmap:
+        st.session_state.mindmap_file = dump_mindmap(mindmap, layout)
+        st.session_state.mindmap_file_for = mindmap
+    st.download_button(
+        "Download Mindmap as LightningRoute file",
+        data=st.session_state.mindmap_file,
+        file_name=f"mindmap.{EXTENSION}",
+        mime=MIME_TYPE,
+        help="Open it again with the 'Mind Map File' input option, without generating it again"
+    )
+
+    # Images are only rendered when asked for, then cached per graph
+    export_col1, export_col2 = st.columns([3,10])
+    export_format = export_col1.selectbox("Export format", list(FORMATS))
+    # Hashing the whole map is only worth doing once per map
+    if st.session_state.get("figure_key_for") is not mindmap:
+        st.session_state.figure_key = mindmap_key(mindmap)
+        st.session_state.figure_key_for = mindmap
+    figure_key = st.session_state.figure_key
+    export_data = cached_export(figure_key, export_format)
+    if export_data is None and export_col1.button(f"Prepare {export_format}"):
+        with st.spinner(f"Rendering {export_format}..."):
+            try:
+                # Exports always show the whole map, not the current view
+                export_fig = fig if not detailed else create_mindmap_figure(mindmap, layout)
+                export_fig.update_layout(font=dict(family="Noto Sans CJK", size=12, color="black"))
+                export_data = export_figure(export_fig, export_format, figure_key)
+            except Exception as e:
+                st.error(f"Error exporting the mind map: {str(e)}")
+    if export_data is not None:
+        extension, mime = FORMATS[export_format]
+        st.download_button(
+            label=f"Download Mindmap as {export_format}",
+            data=export_data,
+            file_name=f"mindmap.{extension}",
+            mime=mime
+        )
+
+    if create_dir == "Yes":
+        # Folders on the server are only useful when running locally, so
+        # the same structure is also offered as a download
+        # Built once per map, not on every slider move or node click
+        if st.session_state.get("mindmap_zip_for") is not mindmap:
+            st.session_state.mindmap_zip = zip_mindmap_directories(mindmap)
+            st.session_state.mindmap_zip_for = mindmap
+        st.download_button(
+            "Download directory structure as ZIP",
+            data=st.session_state.mindmap_zip,
+            file_name="mindmap-folders.zip",
+            mime="application/zip"
+        )
 
 # Add instructions in sidebar
 with st.sidebar:
     st.header("How to use LightningRoute⚡")
     st.markdown("""
-   1. Paste your text in the input area / Upload a file (PDF, DOCX, TXT) / Upload a picture / Enter a video URL
+   1. Paste your text in the input area / Upload a file (PDF, DOCX, TXT) / Upload a picture / Enter a video URL and click 'Transcribe Video'
     2. Choose whether to get a structured file directory or not
     3. Click 'Generate Mind Map'
     4. Interact with the mind map:
         - Zoom in/out
         - Fullscreen
-    5. Download the mind map (as JSON or PNG) for later use
+        - Large maps: choose a detail level and click a node with a (+N) badge to expand it
+    5. Download the mind map (as JSON, PNG, SVG or HTML) for later use
+    6. Open a downloaded .lrmap file with the 'Mind Map File' input option to view it again
     """)
+
+    if tracing.DEBUG_PANEL:
+        # Spans of earlier runs stay visible, newest first
+        spans = (run_spans[::-1] + st.session_state.get("trace_spans", []))[:DEBUG_PANEL_SPANS]
+        st.session_state.trace_spans = spans
+        with st.expander("Debug: stage timings"):
+            if not spans:
+                st.caption("No pipeline stage has run yet.")
+            for span in spans:
+                rss = f"{span.peak_rss / 2**20:.0f} MB" if span.peak_rss else "n/a"
+                sizes = ", ".join(f"{key}={value}" for key, value in span.sizes.items())
+                status = f" **failed: {span.error}**" if span.error else ""
+                st.markdown(f"`{span.stage}` {span.wall * 1000:.0f} ms wall, {span.cpu * 1000:.0f} ms CPU, "
+                            f"peak RSS {rss}{status}  \n{sizes}")
@@ -0,0 +1,6 @@
+# frontend/benchmarks/__init__.py
+"""
+Performance benchmarks for LightningRoute.
+
+Run a benchmark from the repository root, e.g. ``python -m benchmarks.figure``.
+"""
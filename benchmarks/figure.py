@@ -0,0 +1,109 @@
+# frontend/benchmarks/figure.py
+"""
+Benchmark mind map figure construction.
+
+Compares the original one-trace-per-edge renderer with the vectorized
+single edge trace in ``utils.create_mindmap_figure`` and with its
+level-of-detail view capped at ``DETAIL_NODES`` nodes, reporting build
+time and JSON payload size.
+
+Usage:
+    python -m benchmarks.figure [--sizes 100 1000 10000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from benchmarks.fixtures import synthetic_tree
+from utils import create_mindmap_figure
+
+DETAIL_NODES = 1500
+
+
+def per_edge_figure(graph_data):
+    """Reference build with the original one-``go.Scatter``-per-edge traces."""
+    edge_dict = {}
+    for edge in graph_data['edges']:
+        edge_dict.setdefault(edge['from'], []).append(edge['to'])
+    labels = {node['id']: node['label'] for node in graph_data['nodes']}
+    
+    pos = {}
+    stack = [('root', 0.0, 2 * np.pi, 0)]
+    while stack:
+        node_id, start_angle, end_angle, level = stack.pop()
+        angle = (start_angle + end_angle) / 2
+        pos[node_id] = (1.5 * level * np.cos(angle), 1.5 * level * np.sin(angle))
+        children = edge_dict.get(node_id, [])
+        if children:
+            angle_step = (end_angle - start_angle) / len(children)
+            for i, child in enumerate(children):
+                child_start = start_angle + i * angle_step
+                stack.append((child, child_start, child_start + angle_step, level + 1))
+    
+    edge_traces = []
+    for edge in graph_data['edges']:
+        x0, y0 = pos[edge['from']]
+        x1, y1 = pos[edge['to']]
+        edge_traces.append(go.Scatter(
+            x=[x0, x1],
+            y=[y0, y1],
+            line=dict(width=1, color='#888'),
+        ))
+    
+    node_x, node_y, node_text, node_colors = [], [], [], []
+    for node_id, (x, y) in pos.items():
+        node_x.append(x)
+        node_y.append(y)
+        node_text.append(labels[node_id])
+        node_colors.append('#ff7f0e' if node_id == 'root' else '#1f77b4')
+    node_trace = go.Scatter(
+        x=node_x, y=node_y,
+        mode="markers+text",
+        marker=dict(size=10, color=node_colors, line=dict(width=1, color="black")),
+        text=node_text,
+        textposition="top center"
+    )
+    
+    fig = go.Figure([*edge_traces, node_trace])
+    fig.update_layout(
+        showlegend=False,
+        margin=dict(l=20, r=20, t=20, b=20),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False)
+    )
+    return fig
+
+
+def measure(build, graph_data, repeat):
+    """Return the best build time in seconds and the serialized size in bytes."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = build(graph_data)
+        best = min(best, time.perf_counter() - start)
+    return best, len(fig.to_json().encode())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    
+    print(f"{'nodes':>7} {'renderer':>10} {'build (ms)':>11} {'payload (KiB)':>14}")
+    for size in args.sizes:
+        graph_data = synthetic_tree(size)
+        renderers = (
+            ('per-edge', per_edge_figure),
+            ('vectorized', create_mindmap_figure),
+            ('detail', lambda graph: create_mindmap_figure(graph, max_nodes=DETAIL_NODES)),
+        )
+        for name, build in renderers:
+            seconds, payload = measure(build, graph_data, args.repeat)
+            print(f"{size:>7} {name:>10} {seconds * 1000:>11.1f} {payload / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+# frontend/benchmarks/fixtures.py
+"""
+Synthetic inputs shared by the benchmarks.
+
+Everything is generated locally and deterministically: mind map graphs,
+documents in each supported upload format, and a stand-in for the
+completion API, so no benchmark needs an API key or the network.
+"""
+import io
+import json
+import random
+import re
+
+
+def synthetic_tree(n_nodes, fanout=4):
+    """
+    Build a balanced mind map with ``n_nodes`` nodes in the GPT output format.
+    
+    Args:
+        n_nodes (int): Total number of nodes, including the root
+        fanout (int): Number of children per internal node
+        
+    Returns:
+        dict: Dictionary containing nodes and edges data
+    """
+    ids = ['root'] + [str(i) for i in range(1, n_nodes)]
+    nodes = [{'id': node_id, 'label': f'Topic {node_id}'} for node_id in ids]
+    edges = [{'from': ids[(i - 1) // fanout], 'to': ids[i]} for i in range(1, n_nodes)]
+    return {'nodes': nodes, 'edges': edges}
+
+
+def synthetic_dag(n_nodes, fanout=4, extra_edges=0.1, seed=0):
+    """
+    Build a tree like ``synthetic_tree`` plus cross links to earlier nodes.
+
+    Args:
+        n_nodes (int): Total number of nodes, including the root
+        fanout (int): Number of tree children per internal node
+        extra_edges (float): Cross links added per node
+        seed (int): Random seed
+
+    Returns:
+        dict: Dictionary containing nodes and edges data
+    """
+    graph = synthetic_tree(n_nodes, fanout)
+    rng = random.Random(seed)
+    ids = [node['id'] for node in graph['nodes']]
+    for _ in range(int(n_nodes * extra_edges)):
+        target = rng.randrange(2, n_nodes)
+        graph['edges'].append({'from': ids[rng.randrange(1, target)], 'to': ids[target]})
+    return graph
+
+
+def synthetic_chain(depth):
+    """Build a mind map that is a single path of ``depth`` edges."""
+    ids = ['root'] + [str(i) for i in range(1, depth + 1)]
+    return {
+        'nodes': [{'id': node_id, 'label': f'Step {node_id}'} for node_id in ids],
+        'edges': [{'from': ids[i], 'to': ids[i + 1]} for i in range(depth)],
+    }
+
+
+def model_response(graph):
+    """Wrap a graph the way chat models tend to: prose around a fenced JSON block."""
+    return f"Here is the mind map:\n```json\n{json.dumps(graph, indent=2)}\n```\nLet me know if you need changes."
+
+
+def fake_completion(messages, model=None, temperature=None, max_tokens=None):
+    """
+    Deterministic stand-in for ``generation.openai_completion``.
+
+    Builds a two-level mind map from the words of the text in the prompt,
+    so the same prompt always yields the same response.
+    """
+    text = messages[-1]['content'].rsplit("Text to analyze:", 1)[-1]
+    words = re.findall(r"\w+", text)[:400]
+    topics = [" ".join(words[i:i + 4]) for i in range(0, len(words), 4)] or ["empty"]
+    nodes = [{'id': 'root', 'label': topics[0]}]
+    edges = []
+    for i, topic in enumerate(topics[1:], 1):
+        parent = 'root' if i <= 8 else str((i - 1) % 8 + 1)
+        nodes.append({'id': str(i), 'label': topic})
+        edges.append({'from': parent, 'to': str(i)})
+    return model_response({'nodes': nodes, 'edges': edges})
+
+
+def fake_stream(messages, model=None, temperature=None, max_tokens=None, chunk_chars=16):
+    """Streaming variant of ``fake_completion`` for ``generation.stream_mindmap``."""
+    response = fake_completion(messages)
+    for i in range(0, len(response), chunk_chars):
+        yield response[i:i + chunk_chars]
+
+
+def lorem_text(n_words, seed=0):
+    """Return ``n_words`` of pseudo-random prose in sentences and paragraphs."""
+    rng = random.Random(seed)
+    vocabulary = ("mind map node edge graph topic idea lecture note concept summary detail example "
+                  "method result theory data model layout branch root leaf chapter section").split()
+    sentences = []
+    for start in range(0, n_words, 12):
+        words = [rng.choice(vocabulary) for _ in range(min(12, n_words - start))]
+        sentences.append(" ".join(words).capitalize() + ".")
+    paragraphs = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+    return "\n\n".join(paragraphs)
+
+
+def _pdf_string(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages, lines_per_page=40, seed=0):
+    """
+    Build a text-layer PDF without third-party writers.
+
+    Args:
+        pages (int): Number of pages
+        lines_per_page (int): Lines of text on each page
+        seed (int): Random seed for the text
+
+    Returns:
+        bytes: PDF file contents
+    """
+    objects = []
+    page_refs = []
+    font_ref = 3
+    for page in range(pages):
+        lines = lorem_text(lines_per_page * 10, seed + page).replace("\n\n", " ").split(". ")[:lines_per_page]
+        body = " T* ".join(f"({_pdf_string(line)}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {body} ET".encode('latin-1')
+        content_ref = 4 + 2 * page
+        page_refs.append(content_ref + 1)
+        objects.append((content_ref, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+        objects.append((content_ref + 1, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                                          f"/Resources << /Font << /F1 {font_ref} 0 R >> >> "
+                                          f"/Contents {content_ref} 0 R >>").encode()))
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    objects[:0] = [
+        (1, b"<< /Type /Catalog /Pages 2 0 R >>"),
+        (2, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()),
+        (3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"),
+    ]
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for ref, body in objects:
+        offsets[ref] = out.tell()
+        out.write(b"%d 0 obj\n" % ref + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for ref in range(1, len(objects) + 1):
+        out.write(b"%010d 00000 n \n" % offsets[ref])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(paragraphs, seed=0):
+    """Build a Word document with ``paragraphs`` paragraphs of prose."""
+    import docx
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(lorem_text(60, seed + i))
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def make_image(width=1600, height=1200, lines=30, seed=0):
+    """Build a PNG of black text lines on white, like a scanned page."""
+    from PIL import Image, ImageDraw
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    text = lorem_text(lines * 8, seed).replace("\n\n", " ").split(". ")
+    for i, line in enumerate(text[:lines]):
+        draw.text((40, 30 + i * (height - 60) // lines), line, fill=0)
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
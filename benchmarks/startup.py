@@ -0,0 +1,146 @@
+# frontend/benchmarks/startup.py
+"""
+Benchmark app start-up and script rerun latency.
+
+Cold start imports the app's modules in a fresh interpreter under
+``python -X importtime`` and reports the wall time, the slowest imports and
+any heavy dependency from ``deps.MODULES`` that was loaded eagerly. With
+``--deps`` the first-import cost of every registered dependency is measured
+as well. If Streamlit is installed, the app script is also run headlessly
+with ``streamlit.testing`` to time the first run and later reruns.
+
+Usage:
+    python -m benchmarks.startup [--repeat 5] [--top 15] [--deps] [--output report.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import deps
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules app.py imports before it draws anything
+APP_MODULES = ['utils', 'ocr', 'extraction', 'video', 'generation', 'graph', 'mapfile', 'export']
+
+
+def import_profile(modules, repeat=1):
+    """
+    Import modules in fresh interpreters under ``-X importtime``.
+
+    Args:
+        modules (list): Module names to import
+        repeat (int): Number of interpreters to start; the fastest one is kept
+
+    Returns:
+        dict: ``wall_ms`` of the fastest run and its ``imports``, a list of
+        ``(module, self_us, cumulative_us)`` in import order
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+                                cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        wall_ms = (time.perf_counter() - start) * 1000
+        if best is None or wall_ms < best['wall_ms']:
+            best = {'wall_ms': wall_ms, 'imports': _parse_importtime(result.stderr)}
+    return best
+
+
+def _parse_importtime(stderr):
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def eager_dependencies(imports):
+    """Return the registered heavy dependencies found in an import profile."""
+    imported = {name for name, _, _ in imports}
+    return sorted(name for name, path in deps.MODULES.items() if path in imported)
+
+
+def dependency_costs(repeat=1):
+    """Return the cold import time in ms of each installed registered dependency."""
+    costs = {}
+    for name, path in deps.MODULES.items():
+        try:
+            profile = import_profile([path], repeat)
+        except subprocess.CalledProcessError:
+            continue  # Not installed here
+        costs[name] = sum(cumulative for module, _, cumulative in profile['imports'] if module == path) / 1000
+    return costs
+
+
+def rerun_latency(repeat=5):
+    """
+    Time headless runs of ``app.py``.
+
+    Returns:
+        dict: ``first_ms`` and ``rerun_ms`` (median), or None if Streamlit
+        is not installed
+    """
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    app = AppTest.from_file(os.path.join(REPO_ROOT, 'app.py'), default_timeout=120)
+    app.secrets['OPENAI_API_KEY'] = 'benchmark'
+    start = time.perf_counter()
+    app.run()
+    first_ms = (time.perf_counter() - start) * 1000
+    reruns = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app.run()
+        reruns.append((time.perf_counter() - start) * 1000)
+    return {'first_ms': first_ms, 'rerun_ms': statistics.median(reruns)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports to list")
+    parser.add_argument('--deps', action='store_true', help="Also time each registered dependency")
+    parser.add_argument('--output', help="Write the full report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    profile = import_profile(APP_MODULES, args.repeat)
+    eager = eager_dependencies(profile['imports'])
+    report = {
+        'python': sys.version.split()[0],
+        'cold_start_ms': profile['wall_ms'],
+        'imports': profile['imports'],
+        'eager_dependencies': eager,
+    }
+    print(f"cold start: {profile['wall_ms']:.1f} ms (best of {args.repeat})")
+    print(f"heavy dependencies imported at start-up: {', '.join(eager) or 'none'}")
+    print(f"\n{'cumulative (ms)':>16} {'self (ms)':>10}  module")
+    for name, self_us, cumulative_us in sorted(profile['imports'], key=lambda item: -item[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>16.1f} {self_us / 1000:>10.1f}  {name}")
+
+    if args.deps:
+        report['dependency_ms'] = dependency_costs(args.repeat)
+        print(f"\n{'first import (ms)':>18}  dependency")
+        for name, ms in sorted(report['dependency_ms'].items(), key=lambda item: -item[1]):
+            print(f"{ms:>18.1f}  {name}")
+
+    report['app'] = rerun_latency(args.repeat)
+    if report['app'] is None:
+        print("\nStreamlit is not installed; skipping the app run")
+    else:
+        print(f"\napp first run: {report['app']['first_ms']:.1f} ms, rerun: {report['app']['rerun_ms']:.1f} ms (median)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
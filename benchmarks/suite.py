@@ -0,0 +1,247 @@
+# frontend/benchmarks/suite.py
+"""
+Run the offline benchmark and regression suite.
+
+Times the pipeline stages on generated inputs, so no API key, network or
+uploaded files are needed:
+
+* parse: ``extract_graph_data``, ``MindMap.from_dict`` and the streaming
+  parser on fenced model responses;
+* layout and figure: ``radial_layout`` and ``create_mindmap_figure`` on
+  trees, DAGs with cross links and deep chains;
+* export: ``create_directory_from_mindmap``, the ZIP archive and saving
+  and loading map files;
+* extract: text, multi-page PDFs, Word documents, and images (OCR only
+  if EasyOCR is installed);
+* generate: ``generate_mindmap`` and ``stream_mindmap`` with the
+  deterministic ``fixtures.fake_completion`` client.
+
+Each case reports its median and best wall time over ``--repeat`` runs and
+its peak traced allocation, measured with ``tracemalloc`` in one more run
+so the tracing does not slow the timed ones. ``--output`` saves the report
+as JSON. ``--baseline`` compares against a saved report and exits with
+status 1 if a case's best time or peak allocation grew by more than
+``--tolerance``, so changes can be gated on it. Best times are compared
+because they are the least disturbed by other load on the machine.
+
+Usage:
+    python -m benchmarks.suite [--quick] [--repeat 5] [--filter parse] [--output report.json]
+    python -m benchmarks.suite --baseline main.json [--tolerance 0.2]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import fixtures
+from export import create_directory_from_mindmap, zip_mindmap_directories
+from extraction import extract_docx, extract_image, extract_pdf, extract_plain_text
+from generation import generate_mindmap, stream_mindmap
+from graph import MindMap, MindmapStreamParser, extract_graph_data
+from layout import radial_layout
+from mapfile import dump_mindmap, load_mindmap
+from utils import create_mindmap_figure
+
+GRAPH_SIZES = (100, 1000, 10000)
+QUICK_GRAPH_SIZES = (100, 1000)
+CHAIN_DEPTH = 500
+PDF_PAGES = (10, 50)
+DETAIL_NODES = 1500
+# Differences below this are noise, whatever the ratio
+MIN_DELTA_MS = 1.0
+MIN_DELTA_KIB = 64
+
+
+def _graphs(sizes):
+    for size in sizes:
+        yield f"tree-{size}", fixtures.synthetic_tree(size)
+        yield f"dag-{size}", fixtures.synthetic_dag(size)
+    yield f"chain-{CHAIN_DEPTH}", fixtures.synthetic_chain(CHAIN_DEPTH)
+
+
+def _stream(response):
+    parser = MindmapStreamParser()
+    for i in range(0, len(response), 64):
+        parser.feed(response[i:i + 64])
+    return parser
+
+
+def build_cases(quick=False, work_dir=None):
+    """
+    Generate the inputs and return the benchmark cases.
+
+    Args:
+        quick (bool): Skip the largest inputs
+        work_dir (str): Directory the export cases write into
+
+    Returns:
+        list: ``(name, func)`` pairs, where ``func()`` runs the case once
+    """
+    cases = []
+    for name, graph in _graphs(QUICK_GRAPH_SIZES if quick else GRAPH_SIZES):
+        response = fixtures.model_response(graph)
+        mindmap = MindMap.from_dict(graph)
+        layout = radial_layout(mindmap)
+        map_file = dump_mindmap(mindmap, layout)
+        cases += [
+            (f"parse/extract/{name}", lambda response=response: extract_graph_data(response)),
+            (f"parse/validate/{name}", lambda graph=graph: MindMap.from_dict(graph)),
+            (f"parse/stream/{name}", lambda response=response: _stream(response)),
+            (f"parse/mapfile/{name}", lambda map_file=map_file: load_mindmap(map_file)),
+            (f"layout/radial/{name}", lambda mindmap=mindmap: radial_layout(mindmap)),
+            (f"figure/full/{name}", lambda mindmap=mindmap, layout=layout: create_mindmap_figure(mindmap, layout)),
+            (f"figure/detail/{name}", lambda mindmap=mindmap, layout=layout:
+                create_mindmap_figure(mindmap, layout, max_nodes=DETAIL_NODES)),
+            (f"export/zip/{name}", lambda mindmap=mindmap: zip_mindmap_directories(mindmap)),
+            (f"export/mapfile/{name}", lambda mindmap=mindmap, layout=layout: dump_mindmap(mindmap, layout)),
+        ]
+        # A chain this deep exceeds the OS path length limit as folders
+        if work_dir is not None and not name.startswith('chain'):
+            cases.append((f"export/dirs/{name}", lambda mindmap=mindmap, name=name:
+                          _export_directories(mindmap, os.path.join(work_dir, name))))
+
+    text = fixtures.lorem_text(20_000 if quick else 100_000)
+    data = text.encode('utf-8')
+    cases.append(("extract/text", lambda: extract_plain_text(data)))
+    for pages in PDF_PAGES[:1] if quick else PDF_PAGES:
+        pdf = fixtures.make_pdf(pages)
+        cases.append((f"extract/pdf-{pages}p", lambda pdf=pdf: extract_pdf(pdf)))
+    document = fixtures.make_docx(20 if quick else 100)
+    cases.append(("extract/docx", lambda: extract_docx(document)))
+    image = fixtures.make_image()
+    if _ocr_installed():
+        cases.append(("extract/image", lambda: extract_image(image)))
+
+    cases += [
+        ("generate/single", lambda: generate_mindmap(text[:4000], client=fixtures.fake_completion,
+                                                     use_cache=False)),
+        ("generate/chunked", lambda: generate_mindmap(text, client=fixtures.fake_completion, use_cache=False)),
+        ("generate/stream", lambda: list(stream_mindmap(text[:4000], stream_client=fixtures.fake_stream,
+                                                        use_cache=False))),
+    ]
+    return cases
+
+
+def _export_directories(mindmap, path):
+    try:
+        create_directory_from_mindmap(mindmap, path)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _ocr_installed():
+    try:
+        import easyocr  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_case(func, repeat):
+    """
+    Time a case and measure its peak traced allocation.
+
+    Args:
+        func (callable): Runs the case once
+        repeat (int): Timed runs, after one warm-up run
+
+    Returns:
+        dict: ``median_ms``, ``best_ms`` and ``peak_kib``
+    """
+    func()
+    gc.collect()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'median_ms': statistics.median(times), 'best_ms': min(times), 'peak_kib': peak / 1024}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Find cases that regressed against a baseline report.
+
+    A case regresses if its best time or peak allocation exceeds the
+    baseline's by more than ``tolerance`` (a fraction) and by more than
+    ``MIN_DELTA_MS`` or ``MIN_DELTA_KIB``. Cases missing from either report
+    are ignored.
+
+    Args:
+        results (dict): Case name -> measurements, as from ``run_case``
+        baseline (dict): The same, from an earlier run
+        tolerance (float): Allowed relative increase
+
+    Returns:
+        list: ``(case, metric, baseline value, current value)`` tuples
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, min_delta in (('best_ms', MIN_DELTA_MS), ('peak_kib', MIN_DELTA_KIB)):
+            before, after = previous[metric], current[metric]
+            if after > before * (1 + tolerance) and after - before > min_delta:
+                regressions.append((name, metric, before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quick', action='store_true', help="Skip the largest inputs")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help="Only run cases whose name contains this")
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    parser.add_argument('--baseline', help="Report to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown (default 0.2)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="lightningroute-bench-") as work_dir:
+        cases = [(name, func) for name, func in build_cases(args.quick, work_dir) if args.filter in name]
+        results = {}
+        print(f"{'median (ms)':>12} {'best (ms)':>10} {'peak (KiB)':>11}  case")
+        for name, func in cases:
+            results[name] = run_case(func, args.repeat)
+            print(f"{results[name]['median_ms']:>12.2f} {results[name]['best_ms']:>10.2f} "
+                  f"{results[name]['peak_kib']:>11.0f}  {name}")
+
+    if args.output:
+        report = {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'quick': args.quick,
+            'repeat': args.repeat,
+            'cases': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['cases']
+        regressions = compare(results, baseline, args.tolerance)
+        for name, metric, before, after in regressions:
+            print(f"regression: {name} {metric} {before:.2f} -> {after:.2f} (+{(after / before - 1) * 100:.0f}%)",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
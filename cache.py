@@ -0,0 +1,190 @@
+# frontend/cache.py
+"""
+Two-tier text cache used to avoid repeating expensive work across reruns.
+
+Entries live in an in-memory LRU tier and, optionally, in a directory on
+disk. Both tiers evict least recently used entries once they exceed their
+size budget, and entries older than the optional TTL are treated as misses.
+
+Environment:
+    LIGHTNINGROUTE_CACHE_DIR: Directory for the on-disk tier of the shared
+        cache (disabled when unset)
+    LIGHTNINGROUTE_CACHE_MAX_MB: Size budget of the on-disk tier (default 256)
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_key(*parts):
+    """
+    Hash bytes and strings into a cache key.
+
+    Args:
+        *parts: ``bytes`` or ``str`` values; order matters
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """
+    Thread-safe cache of strings keyed by content hashes.
+
+    Args:
+        max_memory_chars (int): Total characters kept in memory
+        disk_dir (str): Directory for the on-disk tier, or None to disable it
+        max_disk_bytes (int): Total size of the on-disk tier
+        ttl (float): Seconds an entry stays valid after it is stored, or None
+            to keep entries until they are evicted
+    """
+
+    def __init__(self, max_memory_chars=20_000_000, disk_dir=None, max_disk_bytes=256 * 1024 * 1024, ttl=None):
+        self.max_memory_chars = max_memory_chars
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._memory_chars = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        """Return the cached text for ``key``, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                text, stored_at = entry
+                if not self._expired(stored_at):
+                    self._memory.move_to_end(key)
+                    return text
+                del self._memory[key]
+                self._memory_chars -= len(text)
+
+        entry = self._disk_get(key)
+        if entry is None:
+            return None
+        text, stored_at = entry
+        self._memory_put(key, text, stored_at)
+        return text
+
+    def put(self, key, text):
+        """Store ``text`` under ``key`` in every enabled tier."""
+        self._memory_put(key, text, time.time())
+        self._disk_put(key, text)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached text for ``key``, computing and storing it on a miss.
+
+        Concurrent misses for the same key run ``compute`` only once.
+
+        Args:
+            key (str): Cache key
+            compute (callable): Zero-argument function returning the text
+
+        Returns:
+            str: Cached or freshly computed text
+        """
+        text = self.get(key)
+        if text is not None:
+            return text
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                text = self.get(key)
+                if text is None:
+                    text = compute()
+                    self.put(key, text)
+                return text
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _memory_put(self, key, text, stored_at):
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_chars -= len(previous[0])
+            if len(text) > self.max_memory_chars:
+                return
+            self._memory[key] = (text, stored_at)
+            self._memory_chars += len(text)
+            while self._memory_chars > self.max_memory_chars:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_chars -= len(evicted)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            stored_at = os.stat(path).st_mtime
+            if self._expired(stored_at):
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            # The access time records use for LRU eviction; the modification
+            # time stays the write time for the TTL
+            os.utime(path, (time.time(), stored_at))
+        except OSError:
+            return None
+        return text, stored_at
+
+    def _disk_put(self, key, text):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        self._disk_evict()
+
+    def _disk_evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.txt'):
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_disk_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+
+# Process-wide cache for extracted and transcribed text
+text_cache = TextCache(
+    disk_dir=os.environ.get('LIGHTNINGROUTE_CACHE_DIR') or None,
+    max_disk_bytes=int(os.environ.get('LIGHTNINGROUTE_CACHE_MAX_MB', '256')) * 1024 * 1024,
+)
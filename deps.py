@@ -0,0 +1,67 @@
+# frontend/deps.py
+"""
+Lazy loading of heavy third-party dependencies.
+
+Plotly, NumPy, the OpenAI client, EasyOCR (and with it PyTorch), yt-dlp and
+the audio stack together take seconds to import. None of them is needed to
+draw the input form, so modules fetch them through ``load`` at the point of
+use instead of importing them at module level. Python caches the module
+after the first call, and ``import_times`` records what each first import
+cost so startup regressions can be traced to a dependency.
+"""
+import importlib
+import sys
+import threading
+import time
+
+# name -> module path of the dependencies the app loads on demand
+MODULES = {
+    'numpy': 'numpy',
+    'plotly': 'plotly.graph_objects',
+    'openai': 'openai',
+    'easyocr': 'easyocr',
+    'yt_dlp': 'yt_dlp',
+    'pydub': 'pydub',
+    'pydub.silence': 'pydub.silence',
+    'speech_recognition': 'speech_recognition',
+    'PyPDF2': 'PyPDF2',
+    'docx': 'docx',
+    'PIL.Image': 'PIL.Image',
+    'PIL.ImageOps': 'PIL.ImageOps',
+    'kaleido': 'kaleido',
+}
+
+# name -> seconds spent on the first import in this process
+import_times = {}
+
+_lock = threading.Lock()
+
+
+def load(name):
+    """
+    Return a registered dependency, importing it on first use.
+
+    Args:
+        name (str): Key of ``MODULES``
+
+    Returns:
+        module: The imported module
+
+    Raises:
+        KeyError: If ``name`` is not registered
+        ImportError: If the dependency is not installed
+    """
+    path = MODULES[name]
+    if path in sys.modules:
+        # import_module still waits for an import running in another thread
+        return importlib.import_module(path)
+    start = time.perf_counter()
+    module = importlib.import_module(path)
+    with _lock:
+        import_times.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def is_loaded(name):
+    """Return whether the dependency ``name`` has been imported in this process."""
+    return MODULES[name] in sys.modules
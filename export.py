@@ -0,0 +1,203 @@
+# frontend/export.py
+"""
+Mind map export: figure images and HTML, folder trees and ZIP archives.
+
+Figure exports run only when a user asks for one and are cached per graph
+hash and format, so reruns and repeated downloads cost nothing. Static
+images go through one long-lived Kaleido renderer per process instead of
+paying the browser start-up on every export.
+
+Folder exports compute every path in one breadth-first pass over the
+mind map's adjacency index, so the edge order of the model response does
+not matter.
+"""
+import io
+import json
+import logging
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+
+import deps
+import tracing
+from cache import content_key
+
+# name -> (file extension, MIME type)
+FORMATS = {
+    'PNG': ('png', 'image/png'),
+    'SVG': ('svg', 'image/svg+xml'),
+    'HTML': ('html', 'text/html'),
+}
+MAX_CACHED_EXPORTS = 32
+# Bump when figure styling changes so cached exports are not reused
+FIGURE_VERSION = 1
+
+# Folder names must be valid on Windows, macOS and Linux
+MAX_NAME_LENGTH = 100
+INVALID_NAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+RESERVED_NAMES = {'CON', 'PRN', 'AUX', 'NUL', *(f'COM{i}' for i in range(1, 10)), *(f'LPT{i}' for i in range(1, 10))}
+
+logger = logging.getLogger(__name__)
+
+_exports = OrderedDict()
+_lock = threading.Lock()
+_renderer_started = False
+
+
+def mindmap_key(mindmap):
+    """Return a hash identifying the figure drawn for ``mindmap``."""
+    return content_key('figure', str(FIGURE_VERSION), json.dumps(mindmap.to_dict(), sort_keys=True))
+
+
+def cached_export(key, fmt):
+    """Return previously exported bytes for ``key`` and ``fmt``, or None."""
+    with _lock:
+        data = _exports.get((key, fmt))
+        if data is not None:
+            _exports.move_to_end((key, fmt))
+        return data
+
+
+def _start_renderer():
+    """Start a persistent Kaleido renderer if this Kaleido version supports one."""
+    global _renderer_started
+    with _lock:
+        if _renderer_started:
+            return
+        _renderer_started = True
+    try:
+        kaleido = deps.load('kaleido')
+        # Kaleido >= 1.0 starts a browser per export unless a sync server
+        # runs; older versions keep their own subprocess alive already.
+        start_sync_server = getattr(kaleido, 'start_sync_server', None)
+        if start_sync_server is not None:
+            start_sync_server(silence_warnings=True)
+    except Exception:
+        logger.warning("Could not start a persistent Kaleido renderer", exc_info=True)
+
+
+def export_figure(fig, fmt, key):
+    """
+    Export a figure, reusing an earlier export of the same graph.
+
+    Args:
+        fig (plotly.graph_objects.Figure): Figure to export
+        fmt (str): One of ``FORMATS``
+        key (str): Hash of the graph drawn in ``fig``, see ``mindmap_key``
+
+    Returns:
+        bytes: Exported file contents
+    """
+    data = cached_export(key, fmt)
+    if data is not None:
+        return data
+
+    with tracing.span('export', format=fmt) as sizes:
+        if fmt == 'HTML':
+            data = fig.to_html(include_plotlyjs=True, full_html=True).encode()
+        else:
+            _start_renderer()
+            data = fig.to_image(format=FORMATS[fmt][0])
+        sizes['bytes'] = len(data)
+
+    with _lock:
+        _exports[(key, fmt)] = data
+        while len(_exports) > MAX_CACHED_EXPORTS:
+            _exports.popitem(last=False)
+    return data
+
+
+def sanitize_name(label):
+    """
+    Turn a node label into a folder name that is valid on Windows, macOS and Linux.
+
+    Args:
+        label (str): Node label
+
+    Returns:
+        str: Safe, non-empty folder name
+    """
+    name = INVALID_NAME_CHARS.sub("_", " ".join(label.split()))[:MAX_NAME_LENGTH].rstrip(". ")
+    if not name or name in (".", ".."):
+        name = "untitled"
+    if name.split(".")[0].upper() in RESERVED_NAMES:
+        name = f"{name}_"
+    return name
+
+
+def directory_paths(mindmap):
+    """
+    Compute the relative folder path of every node reachable from the root.
+
+    Paths are listed parents first. A node with several parents is placed
+    under the first one reached, and siblings whose names collide (ignoring
+    case) get a " (2)", " (3)", ... suffix.
+
+    Args:
+        mindmap (MindMap): Mind map to export
+
+    Returns:
+        list: Relative paths as tuples of folder names, in depth order
+    """
+    root = mindmap.index[mindmap.root]
+    paths = [(sanitize_name(mindmap.nodes[root].label),)]
+    queue = [(root, paths[0])]
+    visited = {root}
+    for node, path in queue:
+        taken = set()
+        for child in mindmap.children[node]:
+            if child in visited:
+                continue
+            visited.add(child)
+            name = base = sanitize_name(mindmap.nodes[child].label)
+            suffix = 1
+            while name.casefold() in taken:
+                suffix += 1
+                name = f"{base} ({suffix})"
+            taken.add(name.casefold())
+            child_path = path + (name,)
+            paths.append(child_path)
+            queue.append((child, child_path))
+    return paths
+
+
+def create_directory_from_mindmap(mindmap, base_path):
+    """
+    Create the mind map as a folder tree under ``base_path``.
+
+    Folders are created parents first with a single ``mkdir`` each.
+
+    Args:
+        mindmap (MindMap): Mind map to export
+        base_path (str): Existing or new directory to create the tree in
+
+    Returns:
+        str: Path of the root folder
+    """
+    os.makedirs(base_path, exist_ok=True)
+    paths = directory_paths(mindmap)
+    for path in paths:
+        try:
+            os.mkdir(os.path.join(base_path, *path))
+        except FileExistsError:
+            pass
+    return os.path.join(base_path, *paths[0])
+
+
+def zip_mindmap_directories(mindmap):
+    """
+    Build a ZIP archive of the mind map folder tree in memory.
+
+    Args:
+        mindmap (MindMap): Mind map to export
+
+    Returns:
+        bytes: ZIP file contents
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in directory_paths(mindmap):
+            archive.writestr("/".join(path) + "/", b"")
+    return buffer.getvalue()
@@ -0,0 +1,191 @@
+# frontend/extraction.py
+"""
+Text extraction for uploaded files.
+
+Every extractor is keyed by a hash of the file bytes plus its version, so a
+given file is extracted once no matter how many Streamlit reruns happen.
+Bump an extractor's version when its output changes to invalidate old
+cache entries.
+
+Extractors take the file contents as bytes or a memoryview and an
+optional ``progress(fraction)`` callback, and return the extracted text.
+Audio and video are piped to ffmpeg straight from the caller's buffer.
+
+``extract_files`` combines several uploads, such as photos of the pages of
+a notebook, into one text. The uploads are extracted in a small thread
+pool, so one image is preprocessed while another is being read by OCR,
+and their texts are joined in page order.
+"""
+import io
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import deps
+import ocr
+import tracing
+from cache import content_key, text_cache
+
+# One more than the OCR calls allowed at once, so the next file is decoded
+# and preprocessed while the OCR engine is busy
+MAX_WORKERS = ocr.MAX_CONCURRENT_OCR + 1
+
+
+def extract_plain_text(data, progress=None):
+    """Decode a UTF-8 text file."""
+    return str(data, 'utf-8')
+
+
+def extract_pdf(data, progress=None, max_workers=None):
+    """Read every PDF page, with OCR for pages that have no text layer."""
+    from pdf import MAX_WORKERS, extract_pdf_text
+    # Worker processes receive the document by pickling, which needs bytes
+    return extract_pdf_text(bytes(data), progress=progress, max_workers=max_workers or MAX_WORKERS)
+
+
+def extract_docx(data, progress=None):
+    """Join the paragraphs of a Word document."""
+    docx = deps.load('docx')
+    doc = docx.Document(io.BytesIO(data))
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs)
+
+
+def extract_image(data, progress=None):
+    """Read text from an image with OCR, after ``ocr.prepare_image``."""
+    np = deps.load('numpy')
+    Image = deps.load('PIL.Image')
+    image = ocr.prepare_image(Image.open(io.BytesIO(data)))
+    return ocr.read_text(np.asarray(image))
+
+
+def extract_mp3(data, progress=None):
+    """Transcribe an MP3 recording."""
+    from transcription import transcribe_file
+    return transcribe_file(data, progress=progress)
+
+
+def extract_mp4(data, progress=None):
+    """Transcribe the audio track of an MP4 video."""
+    from transcription import transcribe_file
+    return transcribe_file(data, progress=progress)
+
+
+# name -> (extractor, version)
+EXTRACTORS = {
+    'text': (extract_plain_text, 1),
+    'pdf': (extract_pdf, 3),
+    'docx': (extract_docx, 1),
+    'image': (extract_image, 2),
+    'mp3': (extract_mp3, 3),
+    'mp4': (extract_mp4, 3),
+}
+
+
+def detect_kind(filename, mime_type):
+    """
+    Pick the extractor for an upload.
+
+    Args:
+        filename (str): Name of the uploaded file
+        mime_type (str): MIME type reported by the browser
+
+    Returns:
+        str: Key into ``EXTRACTORS``, or None if the type is not supported
+    """
+    mime_type = mime_type or ""
+    filename = filename.lower()
+    if mime_type == "text/plain":
+        return 'text'
+    if mime_type == "application/pdf":
+        return 'pdf'
+    if "word" in mime_type:
+        return 'docx'
+    if mime_type.startswith("image/"):
+        return 'image'
+    if filename.endswith(".mp3"):
+        return 'mp3'
+    if filename.endswith(".mp4"):
+        return 'mp4'
+    return None
+
+
+def extract_text(data, filename, mime_type, progress=None, pdf_workers=None):
+    """
+    Extract the text of an uploaded file, reusing earlier results for the same bytes.
+
+    Args:
+        data (bytes or memoryview): File contents
+        filename (str): Name of the uploaded file
+        mime_type (str): MIME type reported by the browser
+        progress (callable): Optional ``progress(fraction)`` callback, only
+            called when the text is not cached
+        pdf_workers (int): Worker processes for large PDFs; defaults to
+            ``pdf.MAX_WORKERS``
+
+    Returns:
+        str: Extracted text
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    kind = detect_kind(filename, mime_type)
+    if kind is None:
+        raise ValueError(f"Unsupported file type: {filename}")
+    extractor, version = EXTRACTORS[kind]
+    options = {'max_workers': pdf_workers} if kind == 'pdf' and pdf_workers else {}
+    key = content_key(kind, str(version), data)
+    with tracing.span('extract', kind=kind, bytes=len(data)) as sizes:
+        sizes['cached'] = True
+
+        def compute():
+            sizes['cached'] = False
+            return extractor(data, progress=progress, **options)
+
+        text = text_cache.get_or_compute(key, compute)
+        sizes['chars'] = len(text)
+    return text
+
+
+def page_order_key(filename):
+    """Sort key putting "page2.jpg" before "page10.jpg"."""
+    return [int(part) if part.isdigit() else part.casefold() for part in re.split(r"(\d+)", filename)]
+
+
+def extract_files(files, progress=None, max_workers=MAX_WORKERS):
+    """
+    Extract the text of several uploads and join it in page order.
+
+    Files are ordered by ``page_order_key`` of their names, the order
+    photographed or scanned pages are numbered in.
+
+    Args:
+        files (list): ``(data, filename, mime_type)`` tuples
+        progress (callable): Optional ``progress(fraction)`` callback
+        max_workers (int): Files extracted at the same time
+
+    Returns:
+        str: Texts of the files separated by blank lines
+
+    Raises:
+        ValueError: If a file type is not supported
+    """
+    files = sorted(files, key=lambda file: page_order_key(file[1]))
+    if len(files) == 1:
+        return extract_text(*files[0], progress=progress)
+
+    done = 0
+    lock = threading.Lock()
+
+    def extract(file):
+        nonlocal done
+        text = extract_text(*file)
+        with lock:
+            done += 1
+            if progress:
+                progress(done / len(files))
+        return text
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extract") as pool:
+        # map() returns results in input order, whichever file finishes first
+        texts = list(pool.map(tracing.propagate(extract), files))
+    return "\n\n".join(text for text in texts if text.strip())
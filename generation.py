@@ -0,0 +1,490 @@
+# frontend/generation.py
+"""
+Mind map generation with a chat completion model.
+
+Text that fits in one prompt is sent as-is. Longer documents are split into
+token-bounded chunks, a partial mind map is generated for each chunk
+concurrently, and the partial maps are merged into one graph with a single
+``root``. ``stream_mindmap`` yields partial maps while a response is still
+arriving so the UI can render early. The merge is deterministic, so it can
+be tested against a fake completion client.
+
+A completion client is any callable
+``client(messages, model, temperature, max_tokens) -> str``.
+
+``stream_sections`` regenerates a map incrementally. It splits the text
+into sections at content-defined boundaries and generates only the
+sections whose hash is not in the previous result. It splices their maps
+in next to the unchanged ones.
+
+Responses are cached by normalized chunk text, prompt version, model and
+parameters, so generating a map for the same text again costs nothing.
+
+Environment:
+    LIGHTNINGROUTE_LLM_CACHE_DIR: Directory for the persistent response
+        cache (memory only when unset)
+    LIGHTNINGROUTE_LLM_CACHE_TTL: Seconds a cached response stays valid
+        (default one week)
+"""
+import logging
+import os
+import re
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import deps
+import tracing
+from cache import TextCache, content_key
+from graph import ROOT_ID, MindMap, MindMapError, MindmapStreamParser, extract_graph_data
+
+MODEL = "gpt-4o"
+TEMPERATURE = 0.7
+DETERMINISTIC_TEMPERATURE = 0.0
+MAX_TOKENS = 2000
+MAX_CHUNK_TOKENS = 6000
+MAX_WORKERS = 4
+# Rough size of a token for English text; good enough for chunk budgeting
+CHARS_PER_TOKEN = 4
+# Average section size; a paragraph ends a section with odds proportional
+# to its length, so sections average this whatever the paragraph sizes
+SECTION_TARGET_TOKENS = 1000
+# Hex digits of the section hash used to namespace its node ids
+SECTION_ID_CHARS = 12
+
+SYSTEM_PROMPT = "You are a mind map generator that converts text into structured mind maps."
+
+PROMPT_TEMPLATE = """Given the following text, create a mind map structure. Extract key concepts and their relationships.
+                Format the response as a JSON with two arrays:
+                1. 'nodes': Each node has 'id' (unique string) and 'label' (displayed text)
+                2. 'edges': Each edge has 'from' and 'to' node IDs showing relationships
+                Root node should have id 'root'. Example format:
+                {{
+                    "nodes": [{{"id": "root", "label": "Main Topic"}}, {{"id": "1", "label": "Subtopic"}}],
+                    "edges": [{{"from": "root", "to": "1"}}]
+                }}
+                {part_note}
+                Text to analyze:
+                {text}
+                """
+
+PART_NOTE = "This text is part {part} of {parts} of a longer document; map only this part.\n"
+# Sections move around as the document is edited, so their note has no position
+SECTION_NOTE = "This text is one section of a longer document; map only this section.\n"
+# Bump whenever the prompts above change so cached responses are not reused
+PROMPT_VERSION = 1
+
+SectionedMindmap = namedtuple('SectionedMindmap', ['sections', 'partials', 'graph', 'settings', 'regenerated'])
+SectionedMindmap.__doc__ = """
+Mind map generated section by section, kept to regenerate it incrementally.
+
+Attributes:
+    sections (list): Content hash of every section, in document order
+    partials (dict): Section hash -> mind map of that section
+    graph (dict): The partial maps merged, as from ``merge_mindmaps``; node
+        ids start with the section hash, so they stay the same as long as
+        the section does
+    settings (tuple): Prompt version and model parameters the partial maps
+        were generated with; they are only reused with the same settings
+    regenerated (tuple): Hashes of the sections generated for this version
+        rather than reused
+"""
+
+logger = logging.getLogger(__name__)
+
+response_cache = TextCache(
+    max_memory_chars=5_000_000,
+    disk_dir=os.environ.get('LIGHTNINGROUTE_LLM_CACHE_DIR') or None,
+    ttl=float(os.environ.get('LIGHTNINGROUTE_LLM_CACHE_TTL', 7 * 24 * 3600)),
+)
+
+
+def openai_completion(messages, model=MODEL, temperature=TEMPERATURE, max_tokens=MAX_TOKENS):
+    """Completion client backed by the OpenAI chat completions API."""
+    openai = deps.load('openai')
+    response = openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    return response.choices[0].message.content
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in ``text``."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_text(text, max_tokens=MAX_CHUNK_TOKENS):
+    """
+    Split text into chunks of at most ``max_tokens`` estimated tokens.
+
+    Chunks break at paragraph boundaries where possible, then at sentence
+    ends, and only cut inside a sentence when a single sentence is too long.
+
+    Args:
+        text (str): Text to split
+        max_tokens (int): Token budget per chunk
+
+    Returns:
+        list: Non-empty text chunks in document order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = ""
+    for piece in _pieces(text, max_chars):
+        if current and len(current) + 2 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _pieces(text, max_chars):
+    """Yield the non-empty paragraphs of ``text``, cutting those over ``max_chars`` at sentence ends."""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= max_chars:
+            if paragraph:
+                yield paragraph
+            continue
+        for sentence in re.split(r"(?<=[.!?。！？])\s+", paragraph):
+            yield from filter(None, (sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)))
+
+
+def split_sections(text, target_tokens=SECTION_TARGET_TOKENS, max_tokens=MAX_CHUNK_TOKENS):
+    """
+    Split text into sections whose boundaries depend only on nearby content.
+
+    ``split_text`` packs chunks greedily, so inserting a sentence moves
+    every later chunk boundary. Here whether a paragraph ends a section
+    depends only on its hash and length, never on where the section
+    started, and only a section reaching ``max_tokens`` is cut elsewhere.
+    An edit therefore changes the section it falls in and, if it makes or
+    unmakes a boundary, the one after it.
+
+    Args:
+        text (str): Normalized text to split
+        target_tokens (int): Average section size
+        max_tokens (int): Token budget per section
+
+    Returns:
+        list: Non-empty sections in document order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    target_chars = target_tokens * CHARS_PER_TOKEN
+    sections = []
+    current = ""
+    for piece in _pieces(text, max_chars):
+        if current and len(current) + 2 + len(piece) > max_chars:
+            sections.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+        # The hash prefix is uniform in [0, 2**32)
+        if int(content_key(piece)[:8], 16) < len(piece) / target_chars * 2 ** 32:
+            sections.append(current)
+            current = ""
+    if current:
+        sections.append(current)
+    return sections
+
+
+def normalize_text(text):
+    """Normalize Unicode form and whitespace so trivially different inputs share a cache entry."""
+    lines = (" ".join(line.split()) for line in unicodedata.normalize("NFC", text).splitlines())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def parse_mindmap(response_text):
+    """Parse a mind map JSON document out of a model response."""
+    with tracing.span('parse', chars=len(response_text)) as sizes:
+        graph_data = extract_graph_data(response_text)
+        # Only recorded here; MindMap.from_dict decides whether the map is usable
+        sizes['nodes'] = _count(graph_data.get('nodes'))
+        sizes['edges'] = _count(graph_data.get('edges'))
+    return graph_data
+
+
+def _count(items):
+    return len(items) if isinstance(items, list) else 0
+
+
+def _normalize_label(label):
+    return " ".join(str(label).split()).casefold()
+
+
+def merge_mindmaps(partials, prefixes=None):
+    """
+    Merge partial mind maps into one graph.
+
+    Each partial map is validated with ``MindMap.from_dict`` first, and one
+    with no usable nodes is skipped. Node ids are namespaced per partial
+    map, nodes with the same label (ignoring case and whitespace) are
+    merged into the first one seen, and the root of every later partial map
+    hangs off the root of the first, which becomes 'root', unless it has
+    the same label. Duplicate edges and self-loops are dropped. The result
+    only depends on the order of ``partials``.
+
+    Args:
+        partials (list): Mind maps in the GPT output format
+        prefixes (list): Id namespace of each partial map; defaults to its
+            position in ``partials``
+
+    Returns:
+        dict: Dictionary containing nodes and edges data
+    """
+    nodes = []
+    edges = []
+    by_label = {}
+    merged_ids = set()
+    seen_edges = set()
+
+    def add_edge(src, dst):
+        if src != dst and (src, dst) not in seen_edges:
+            seen_edges.add((src, dst))
+            edges.append({'from': src, 'to': dst})
+
+    first = True
+    for part, graph in enumerate(partials):
+        try:
+            mindmap = MindMap.from_dict(graph)
+        except MindMapError as e:
+            logger.warning("Skipped partial mind map %d: %s", part, e)
+            continue
+        prefix = part if prefixes is None else prefixes[part]
+        remap = {}
+        for node in mindmap.nodes:
+            label = _normalize_label(node.label)
+            if first and node.id == mindmap.root:
+                merged_id = ROOT_ID
+            else:
+                merged_id = by_label.get(label, f"{prefix}.{node.id}")
+            if merged_id not in merged_ids:
+                merged_ids.add(merged_id)
+                nodes.append({'id': merged_id, 'label': node.label})
+                by_label.setdefault(label, merged_id)
+            remap[node.id] = merged_id
+
+        for edge in mindmap.edges:
+            add_edge(remap[edge.source], remap[edge.target])
+        if not first:
+            add_edge(ROOT_ID, remap[mindmap.root])
+        first = False
+
+    return {'nodes': nodes, 'edges': edges}
+
+
+def _response_key(part_note, chunk, model, temperature, max_tokens):
+    return content_key('mindmap', str(PROMPT_VERSION), model, repr(temperature), str(max_tokens),
+                       part_note, chunk)
+
+
+def _messages(part_note, chunk):
+    return [{
+        "role": "system",
+        "content": SYSTEM_PROMPT
+    }, {
+        "role": "user",
+        "content": PROMPT_TEMPLATE.format(part_note=part_note, text=chunk)
+    }]
+
+
+def _prepare(text, temperature, deterministic, max_chunk_tokens):
+    """Return the effective temperature and the chunks with their part notes."""
+    if deterministic:
+        temperature = DETERMINISTIC_TEMPERATURE
+    text = normalize_text(text)
+    chunks = split_text(text, max_chunk_tokens) if estimate_tokens(text) > max_chunk_tokens else [text]
+    if len(chunks) == 1:
+        return temperature, [("", chunks[0])]
+    return temperature, [(PART_NOTE.format(part=part, parts=len(chunks)), chunk)
+                         for part, chunk in enumerate(chunks, 1)]
+
+
+def _generate_part(client, part_note, chunk, model, temperature, max_tokens, use_cache):
+    def complete():
+        with tracing.span('llm', model=model, prompt_chars=len(chunk)) as sizes:
+            response_text = client(_messages(part_note, chunk), model=model, temperature=temperature,
+                                   max_tokens=max_tokens)
+            sizes['response_chars'] = len(response_text)
+        parse_mindmap(response_text)  # Only well-formed responses are cached
+        return response_text
+
+    if not use_cache:
+        return parse_mindmap(complete())
+    key = _response_key(part_note, chunk, model, temperature, max_tokens)
+    return parse_mindmap(response_cache.get_or_compute(key, complete))
+
+
+def generate_mindmap(text, client=None, model=MODEL, temperature=TEMPERATURE, max_tokens=MAX_TOKENS,
+                     max_chunk_tokens=MAX_CHUNK_TOKENS, max_workers=MAX_WORKERS, deterministic=False,
+                     use_cache=True):
+    """
+    Generate a mind map for ``text``, splitting long documents into chunks.
+
+    Args:
+        text (str): Text to analyze
+        client (callable): Completion client; defaults to ``openai_completion``
+        model (str): Model name passed to the client
+        temperature (float): Sampling temperature
+        max_tokens (int): Response token limit per request
+        max_chunk_tokens (int): Input token budget per request
+        max_workers (int): Maximum concurrent requests
+        deterministic (bool): Sample at temperature 0 so the same text
+            always maps to the same graph
+        use_cache (bool): Reuse and store responses in ``response_cache``
+
+    Returns:
+        dict: Dictionary containing nodes and edges data
+    """
+    client = client or openai_completion
+    temperature, parts = _prepare(text, temperature, deterministic, max_chunk_tokens)
+
+    def generate_part(part):
+        part_note, chunk = part
+        return _generate_part(client, part_note, chunk, model, temperature, max_tokens, use_cache)
+
+    if len(parts) == 1:
+        return generate_part(parts[0])
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generate") as pool:
+        partials = list(pool.map(tracing.propagate(generate_part), parts))
+    return merge_mindmaps(partials)
+
+
+def openai_stream(messages, model=MODEL, temperature=TEMPERATURE, max_tokens=MAX_TOKENS):
+    """Streaming completion client yielding text deltas from the OpenAI API."""
+    openai = deps.load('openai')
+    response = openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    for chunk in response:
+        if chunk.choices:
+            delta = chunk.choices[0].delta.get("content")
+            if delta:
+                yield delta
+
+
+def stream_mindmap(text, stream_client=None, client=None, model=MODEL, temperature=TEMPERATURE,
+                   max_tokens=MAX_TOKENS, max_chunk_tokens=MAX_CHUNK_TOKENS, max_workers=MAX_WORKERS,
+                   deterministic=False, use_cache=True):
+    """
+    Generate a mind map, yielding partial maps while the response arrives.
+
+    Short inputs are streamed and a new snapshot is yielded whenever a node
+    or edge completes. Long inputs are generated chunk by chunk as in
+    ``generate_mindmap`` and the merged map is yielded each time a chunk
+    finishes. The last value yielded is always the complete map, identical
+    to what ``generate_mindmap`` returns for the same response.
+
+    Args:
+        text (str): Text to analyze
+        stream_client (callable): Streaming client yielding text deltas;
+            defaults to ``openai_stream``
+        client (callable): Completion client for long inputs; defaults to
+            ``openai_completion``
+        (other arguments as for ``generate_mindmap``)
+
+    Yields:
+        dict: Dictionary containing nodes and edges data
+    """
+    stream_client = stream_client or openai_stream
+    client = client or openai_completion
+    temperature, parts = _prepare(text, temperature, deterministic, max_chunk_tokens)
+
+    if len(parts) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generate") as pool:
+            futures = {
+                pool.submit(tracing.propagate(_generate_part), client, part_note, chunk, model, temperature,
+                            max_tokens, use_cache): i
+                for i, (part_note, chunk) in enumerate(parts)
+            }
+            finished = {}
+            for future in as_completed(futures):
+                finished[futures[future]] = future.result()
+                yield merge_mindmaps([finished[i] for i in sorted(finished)])
+        return
+
+    part_note, chunk = parts[0]
+    key = _response_key(part_note, chunk, model, temperature, max_tokens)
+    cached = response_cache.get(key) if use_cache else None
+    if cached is not None:
+        yield parse_mindmap(cached)
+        return
+
+    parser = MindmapStreamParser()
+    # The wall time includes whatever the caller does with each partial map
+    with tracing.span('llm', model=model, prompt_chars=len(chunk), stream=True) as sizes:
+        for delta in stream_client(_messages(part_note, chunk), model=model, temperature=temperature,
+                                   max_tokens=max_tokens):
+            if parser.feed(delta):
+                yield parser.graph()
+        sizes['response_chars'] = len(parser.text)
+    graph_data = parse_mindmap(parser.text)
+    if use_cache:
+        response_cache.put(key, parser.text)
+    yield graph_data
+
+
+def stream_sections(text, previous=None, client=None, model=MODEL, temperature=TEMPERATURE, max_tokens=MAX_TOKENS,
+                    max_workers=MAX_WORKERS, deterministic=False, use_cache=True):
+    """
+    Generate a mind map section by section, reusing unchanged sections.
+
+    The text is split with ``split_sections``. Sections whose content hash
+    appears in ``previous`` keep their partial map, only new or edited
+    sections are sent to the model, and the partial maps are spliced
+    together with ``merge_mindmaps``. Editing a long document therefore
+    costs about one request per edited section.
+
+    Args:
+        text (str): Text to analyze
+        previous (SectionedMindmap): Result for an earlier version of the
+            text, or None to generate every section
+        (other arguments as for ``generate_mindmap``)
+
+    Yields:
+        SectionedMindmap: The map of the sections done so far, once with the
+        reused sections and then after each generated section; the last
+        value is complete
+    """
+    client = client or openai_completion
+    if deterministic:
+        temperature = DETERMINISTIC_TEMPERATURE
+    sections = split_sections(normalize_text(text))
+    keys = [content_key(section) for section in sections]
+    settings = (PROMPT_VERSION, model, temperature, max_tokens)
+    reusable = previous.partials if previous is not None and previous.settings == settings else {}
+    partials = {key: reusable[key] for key in keys if key in reusable}
+    todo = {key: section for key, section in zip(keys, sections) if key not in partials}
+    # A lone section is the whole text and is prompted like one
+    part_note = SECTION_NOTE if len(sections) > 1 else ""
+    regenerated = []
+
+    def snapshot():
+        done = [key for key in dict.fromkeys(keys) if key in partials]
+        graph = merge_mindmaps([partials[key] for key in done], [key[:SECTION_ID_CHARS] for key in done])
+        return SectionedMindmap(keys, dict(partials), graph, settings, tuple(regenerated))
+
+    if partials or not todo:
+        yield snapshot()
+    if not todo:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generate") as pool:
+        futures = {
+            pool.submit(tracing.propagate(_generate_part), client, part_note, section, model, temperature,
+                        max_tokens, use_cache): key
+            for key, section in todo.items()
+        }
+        for future in as_completed(futures):
+            partials[futures[future]] = future.result()
+            regenerated.append(futures[future])
+            yield snapshot()
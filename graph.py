@@ -0,0 +1,271 @@
+# frontend/graph.py
+"""
+Mind map graph model and parsing of model output.
+
+``MindMap`` holds compact node and edge records plus an adjacency index
+built once, and is shared by the layout, rendering and directory export.
+``extract_graph_data`` pulls the JSON document out of a chatty or fenced
+model response and salvages truncated output, and ``MindMap.from_dict``
+validates ids, dangling edges and the root in a single linear pass.
+"""
+import json
+import logging
+import re
+from collections import namedtuple
+
+Node = namedtuple('Node', ['id', 'label'])
+Edge = namedtuple('Edge', ['source', 'target'])
+
+ROOT_ID = 'root'
+
+FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+
+logger = logging.getLogger(__name__)
+
+
+class MindMapError(ValueError):
+    """Raised when model output cannot be turned into a mind map."""
+
+
+class MindMap:
+    """
+    Validated mind map with an adjacency index.
+
+    Build instances with ``MindMap.from_dict``; the constructor trusts its
+    input.
+
+    Attributes:
+        nodes (list): ``Node`` records
+        edges (list): ``Edge`` records between known, distinct nodes
+        root (str): Id of the root node
+        index (dict): Mapping of node id to its position in ``nodes``
+        children (list): Child positions for every node, in edge order
+        warnings (list): Problems fixed while validating the input
+    """
+
+    __slots__ = ('nodes', 'edges', 'root', 'index', 'children', 'warnings')
+
+    def __init__(self, nodes, edges, root=ROOT_ID, warnings=None):
+        self.nodes = nodes
+        self.edges = edges
+        self.root = root
+        self.index = {node.id: i for i, node in enumerate(nodes)}
+        self.children = [[] for _ in nodes]
+        for edge in edges:
+            self.children[self.index[edge.source]].append(self.index[edge.target])
+        self.warnings = warnings or []
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Validate mind map data in the GPT output format.
+
+        Node ids are converted to strings and missing labels fall back to
+        the id. Duplicate nodes, edges to unknown nodes, self-loops and
+        repeated edges are dropped. Without a node called 'root', the first
+        node that has no incoming edge becomes the root.
+
+        Args:
+            data (dict): Dictionary containing nodes and edges data
+
+        Returns:
+            MindMap: Validated mind map
+
+        Raises:
+            MindMapError: If the data has no usable nodes
+        """
+        if not isinstance(data, dict):
+            raise MindMapError("Mind map must be a JSON object")
+        warnings = []
+
+        nodes = []
+        ids = set()
+        for raw in data.get('nodes') or []:
+            if not isinstance(raw, dict) or raw.get('id') is None:
+                warnings.append(f"Skipped node without an id: {raw!r}")
+                continue
+            node_id = str(raw['id'])
+            if node_id in ids:
+                warnings.append(f"Skipped duplicate node '{node_id}'")
+                continue
+            ids.add(node_id)
+            label = raw.get('label')
+            nodes.append(Node(node_id, node_id if label is None else str(label)))
+        if not nodes:
+            raise MindMapError("Mind map has no nodes")
+
+        edges = []
+        seen = set()
+        has_parent = set()
+        for raw in data.get('edges') or []:
+            if not isinstance(raw, dict):
+                warnings.append(f"Skipped malformed edge: {raw!r}")
+                continue
+            source = raw.get('from', raw.get('source'))
+            target = raw.get('to', raw.get('target'))
+            edge = Edge(str(source), str(target))
+            if edge.source not in ids or edge.target not in ids:
+                warnings.append(f"Skipped edge to an unknown node: {edge.source} -> {edge.target}")
+                continue
+            if edge.source == edge.target or edge in seen:
+                continue
+            seen.add(edge)
+            has_parent.add(edge.target)
+            edges.append(edge)
+
+        root = ROOT_ID
+        if root not in ids:
+            root = next((node.id for node in nodes if node.id not in has_parent), nodes[0].id)
+            warnings.append(f"No 'root' node; using '{root}' as the root")
+        return cls(nodes, edges, root, warnings)
+
+    def to_dict(self):
+        """Return the mind map in the GPT output format."""
+        return {
+            'nodes': [{'id': node.id, 'label': node.label} for node in self.nodes],
+            'edges': [{'from': edge.source, 'to': edge.target} for edge in self.edges],
+        }
+
+    def label(self, node_id):
+        """Return the label of ``node_id``."""
+        return self.nodes[self.index[node_id]].label
+
+
+def as_mindmap(graph):
+    """Return ``graph`` as a ``MindMap``, validating it if it is a plain dict."""
+    return graph if isinstance(graph, MindMap) else MindMap.from_dict(graph)
+
+
+class MindmapStreamParser:
+    """
+    Incremental parser for a mind map JSON document arriving in pieces.
+
+    Every object in the top-level 'nodes' and 'edges' arrays is decoded as
+    soon as its closing brace arrives. Text before the first ``{`` (such as
+    a code fence or a sentence of preamble) and after the document is
+    ignored, and a malformed element is skipped rather than failing the
+    whole stream.
+
+    Attributes:
+        text (str): Everything fed so far
+        nodes (list): Node dicts completed so far
+        edges (list): Edge dicts completed so far
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.nodes = []
+        self.edges = []
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key = None
+        self._array = None
+        self._element_start = 0
+        self._done = False
+
+    def feed(self, delta):
+        """
+        Consume the next piece of the response.
+
+        Args:
+            delta (str): Newly received text
+
+        Returns:
+            bool: True if at least one node or edge was completed
+        """
+        self.text += delta
+        found = False
+        text = self.text
+        stack = self._stack
+        for i in range(self._pos, len(text)):
+            if self._done:
+                break
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(stack) == 1:
+                        self._last_key = text[self._string_start:i + 1]
+                continue
+            if not stack and char != "{":
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                if stack == ["{", "["] and char == "{":
+                    self._element_start = i
+                elif stack == ["{"] and char == "[":
+                    self._array = self._last_key
+                stack.append(char)
+            elif char in "}]":
+                if stack:
+                    stack.pop()
+                if stack == ["{", "["] and char == "}":
+                    found |= self._emit(text[self._element_start:i + 1])
+                elif not stack:
+                    self._done = True
+        self._pos = len(text)
+        return found
+
+    def _emit(self, element):
+        try:
+            item = json.loads(element)
+        except ValueError:
+            return False
+        if self._array == '"nodes"':
+            self.nodes.append(item)
+        elif self._array == '"edges"':
+            self.edges.append(item)
+        else:
+            return False
+        return True
+
+    def graph(self):
+        """Return the mind map parsed so far."""
+        return {'nodes': list(self.nodes), 'edges': list(self.edges)}
+
+
+def extract_graph_data(response_text):
+    """
+    Extract mind map data from a model response.
+
+    The JSON document may be wrapped in a code fence or surrounded by
+    prose. If it does not parse, for example because the response was cut
+    off at the token limit, every complete node and edge is kept.
+
+    Args:
+        response_text (str): Raw model response
+
+    Returns:
+        dict: Dictionary containing nodes and edges data
+
+    Raises:
+        MindMapError: If no mind map can be recovered
+    """
+    match = FENCE_RE.search(response_text)
+    candidate = match.group(1) if match else response_text
+    start = candidate.find("{")
+    if start < 0:
+        raise MindMapError("The response does not contain a JSON object")
+    try:
+        data, _ = json.JSONDecoder().raw_decode(candidate, start)
+        if isinstance(data, dict):
+            return data
+    except ValueError:
+        pass
+
+    parser = MindmapStreamParser()
+    parser.feed(candidate[start:])
+    if not parser.nodes:
+        raise MindMapError("Could not parse the mind map JSON")
+    logger.warning("Repaired malformed mind map JSON: kept %d nodes and %d edges",
+                   len(parser.nodes), len(parser.edges))
+    return parser.graph()
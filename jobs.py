@@ -0,0 +1,169 @@
+# frontend/jobs.py
+"""
+Background jobs for long-running work.
+
+Text extraction, OCR, transcription, video downloads and mind map
+generation run in a bounded thread pool instead of the Streamlit script
+thread. A widget interaction that reruns the script no longer cancels
+them, and a slow job no longer holds a script thread. The script keeps the
+job id in session state and polls the job's status and progress on each
+run.
+
+Jobs are keyed by their inputs. Submitting work whose key matches a job
+that is queued, running or finished returns that job instead of starting
+another, across sessions too. Each job runs with its own temporary
+directory, removed when the job ends, and finished jobs are forgotten
+after ``JOB_TTL`` seconds.
+
+Environment:
+    LIGHTNINGROUTE_JOB_WORKERS: Jobs run at the same time (default 2)
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+MAX_WORKERS = max(1, int(os.environ.get('LIGHTNINGROUTE_JOB_WORKERS', '2')))
+JOB_TTL = 3600
+MAX_FINISHED_JOBS = 100
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    State of one background job, updated by the worker and read by the UI.
+
+    Attributes:
+        id (str): Job id to keep in session state
+        key (str): De-duplication key
+        status (str): ``QUEUED``, ``RUNNING``, ``DONE`` or ``FAILED``
+        progress (float): Fraction done, between 0 and 1
+        message (str): Current step, for display
+        partial: Latest intermediate result published by the task, or None
+        result: Return value of the task once ``DONE``
+        error (Exception): Exception raised by the task once ``FAILED``
+        work_dir (str): Private temporary directory while the job runs
+        spans (list): ``tracing.Span`` records of the stages the task ran
+        finished_at (float): Unix time the job ended, or None
+    """
+
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a free worker..."
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.work_dir = None
+        self.spans = []
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        """Whether the job is ``DONE`` or ``FAILED``."""
+        return self.status in (DONE, FAILED)
+
+    def report(self, fraction, message=None):
+        """Progress callback for the task; also usable as ``progress(fraction)``."""
+        self.progress = min(max(fraction, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def publish(self, value):
+        """Make an intermediate result available to the UI."""
+        self.partial = value
+
+
+class JobQueue:
+    """
+    Bounded pool of background jobs with de-duplication by key.
+
+    Args:
+        max_workers (int): Jobs run at the same time; later ones queue
+        ttl (float): Seconds a finished job stays available
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, ttl=JOB_TTL):
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, task):
+        """
+        Run ``task(job)`` in the background unless an identical job exists.
+
+        A failed job with the same key is replaced, so submitting again
+        retries it.
+
+        Args:
+            key (str): Identifies the work, e.g. a ``cache.content_key`` of its inputs
+            task (callable): ``task(job) -> result``; may call ``job.report``
+                and ``job.publish`` and write files under ``job.work_dir``
+
+        Returns:
+            str: Id of the new or existing job
+        """
+        with self._lock:
+            self._evict()
+            job = self._by_key.get(key)
+            if job is not None and job.status != FAILED:
+                return job.id
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        self._pool.submit(self._run, job, task)
+        return job.id
+
+    def get(self, job_id):
+        """Return the job with ``job_id``, or None if it is unknown or expired."""
+        return self._jobs.get(job_id)
+
+    def _run(self, job, task):
+        job.work_dir = tempfile.mkdtemp(prefix="lightningroute-job-")
+        job.status = RUNNING
+        job.message = "Starting..."
+        try:
+            with tracing.collect() as spans:
+                job.spans = spans
+                result = task(job)
+            job.result = result
+            job.progress = 1.0
+            job.finished_at = time.time()
+            job.status = DONE
+        except Exception as e:
+            logger.exception("Background job %s failed", job.id)
+            job.error = e
+            job.finished_at = time.time()
+            job.status = FAILED
+        finally:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def _evict(self):
+        now = time.time()
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        excess = len(finished) - MAX_FINISHED_JOBS
+        for i, job in enumerate(finished):
+            if i >= excess and now - job.finished_at < self.ttl:
+                break
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+
+job_queue = JobQueue()
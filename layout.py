@@ -0,0 +1,199 @@
+# frontend/layout.py
+"""
+Radial tree layout for mind maps.
+
+The layout is a pure function of the mind map and returns plain NumPy
+arrays, so it can be cached and tested without Plotly. The graph is walked
+breadth-first with an explicit queue, which keeps the cost linear in the
+number of nodes and edges and avoids Python's recursion limit on deep trees.
+Edges that would close a cycle or give a node a second parent are kept out
+of the tree and reported in ``dropped_edges``.
+"""
+from collections import namedtuple
+
+import deps
+import tracing
+from graph import Edge, as_mindmap
+
+LEVEL_SPACING = 1.5
+
+RadialLayout = namedtuple('RadialLayout', ['ids', 'index', 'x', 'y', 'depth', 'parent', 'subtree_size',
+                                           'dropped_edges'])
+RadialLayout.__doc__ = """
+Node positions of a radial tree layout, in breadth-first order.
+
+Attributes:
+    ids (list): Node ids; row ``i`` of every array belongs to ``ids[i]``
+    index (dict): Mapping of node id to its row
+    x (numpy.ndarray): Horizontal coordinates
+    y (numpy.ndarray): Vertical coordinates
+    depth (numpy.ndarray): Distance from the root in edges
+    parent (numpy.ndarray): Row of the tree parent, -1 for the root; never
+        decreases, so the children of a row are a contiguous run of rows
+    subtree_size (numpy.ndarray): Number of nodes in the subtree of each
+        row, the row itself included
+    dropped_edges (list): ``Edge`` records left out of the tree (cycles, second parents)
+"""
+
+
+def radial_layout(graph, leaf_weighted=True, level_spacing=LEVEL_SPACING):
+    """
+    Compute a radial tree layout for a mind map.
+
+    Nodes that cannot be reached from the root are not positioned.
+
+    Args:
+        graph (MindMap or dict): Mind map, or a dictionary containing nodes
+            and edges data
+        leaf_weighted (bool): Give each subtree an angle proportional to its
+            number of leaves instead of an equal share per sibling
+        level_spacing (float): Radius added per tree level
+
+    Returns:
+        RadialLayout: Positions and tree structure of the reachable nodes
+    """
+    mindmap = as_mindmap(graph)
+    with tracing.span('layout', nodes=len(mindmap.nodes), edges=len(mindmap.edges)):
+        return _radial_layout(mindmap, leaf_weighted, level_spacing)
+
+
+def _radial_layout(mindmap, leaf_weighted, level_spacing):
+    np = deps.load('numpy')
+    node_ids = [node.id for node in mindmap.nodes]
+    children = mindmap.children
+    dropped_edges = []
+
+    # Breadth-first walk; the order list doubles as the queue
+    root = mindmap.index[mindmap.root]
+    order = [root]
+    visited = {root}
+    parent_rows = [-1]
+    depth_list = [0]
+    head = 0
+    while head < len(order):
+        node = order[head]
+        for child in children[node]:
+            if child in visited:
+                dropped_edges.append(Edge(node_ids[node], node_ids[child]))
+                continue
+            visited.add(child)
+            order.append(child)
+            parent_rows.append(head)
+            depth_list.append(depth_list[head] + 1)
+        head += 1
+
+    n = len(order)
+    parent = np.array(parent_rows, dtype=np.intp)
+    depth = np.array(depth_list, dtype=np.intp)
+    # Breadth-first order sorts rows by depth, so every level is a slice
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(depth)) + 1, [n]))
+    levels = [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    # Subtree sizes and leaf counts, accumulated bottom-up in reverse
+    # breadth-first order
+    subtree_size = [1] * n
+    for i in range(n - 1, 0, -1):
+        subtree_size[parent_rows[i]] += subtree_size[i]
+    if leaf_weighted:
+        has_children = np.zeros(n, dtype=bool)
+        has_children[parent[1:]] = True
+        leaf_count = (~has_children).astype(float).tolist()
+        for i in range(n - 1, 0, -1):
+            leaf_count[parent_rows[i]] += leaf_count[i]
+        weight = np.array(leaf_count)
+    else:
+        weight = np.ones(n)
+
+    # Split each parent's angular span between its children, top-down.
+    # Breadth-first order keeps siblings contiguous, so offsets within a
+    # sibling group come from one cumulative sum per level.
+    start = np.zeros(n)
+    span = np.zeros(n)
+    span[0] = 2 * np.pi
+    for members in levels[1:]:
+        parents = parent[members]
+        share = weight[members]
+        before = np.cumsum(share) - share
+        group_first = np.empty(len(parents), dtype=bool)
+        group_first[0] = True
+        np.not_equal(parents[1:], parents[:-1], out=group_first[1:])
+        group = np.cumsum(group_first) - 1
+        group_base = before[group_first][group]
+        total = np.add.reduceat(share, np.flatnonzero(group_first))[group]
+        start[members] = start[parents] + (before - group_base) / total * span[parents]
+        span[members] = share / total * span[parents]
+
+    angle = start + span / 2
+    radius = level_spacing * depth
+    ids = [node_ids[node] for node in order]
+    return RadialLayout(
+        ids=ids,
+        index={node_id: i for i, node_id in enumerate(ids)},
+        x=radius * np.cos(angle),
+        y=radius * np.sin(angle),
+        depth=depth,
+        parent=parent,
+        subtree_size=np.array(subtree_size, dtype=np.intp),
+        dropped_edges=dropped_edges,
+    )
+
+
+def depth_for_budget(layout, max_nodes):
+    """
+    Return the deepest level that can be shown in full within a node budget.
+
+    Args:
+        layout (RadialLayout): Layout of the whole mind map
+        max_nodes (int): Maximum number of nodes to show
+
+    Returns:
+        int: Depth, at least 1 if the root has children
+    """
+    np = deps.load('numpy')
+    # Rows are sorted by depth, so nodes up to depth d are a prefix
+    ends = np.searchsorted(layout.depth, np.arange(int(layout.depth[-1]) + 1), side='right')
+    return max(min(1, len(ends) - 1), int(np.searchsorted(ends, max_nodes, side='right')) - 1)
+
+
+def visible_rows(layout, max_depth=None, expanded=(), max_nodes=None):
+    """
+    Select the nodes of a level-of-detail view and count what each one hides.
+
+    Nodes down to ``max_depth`` are shown, and beyond ``max_nodes`` of them
+    the deepest are cut, in breadth-first order. The children of every
+    shown, expanded node are then shown too, even past ``max_nodes``, so a
+    node with any hidden child can always be opened. The cost is linear in
+    the number of nodes, so a view can be recomputed on every rerun.
+
+    Args:
+        layout (RadialLayout): Layout of the whole mind map
+        max_depth (int): Deepest level shown without expanding; None for all
+        expanded (iterable): Ids of nodes whose children are shown regardless
+            of depth
+        max_nodes (int): Maximum number of nodes shown before expanding;
+            None for no limit
+
+    Returns:
+        tuple: Array of the shown rows in breadth-first order, and an array
+        with the number of nodes in the subtrees of the hidden children of
+        each of them, 0 if every child is shown
+    """
+    np = deps.load('numpy')
+    n = len(layout.ids)
+    parent = layout.parent
+    shown = np.ones(n, dtype=bool) if max_depth is None else layout.depth <= max_depth
+    if max_nodes is not None:
+        shown &= np.cumsum(shown) <= max_nodes
+    # Parents precede their children, so nested expansions open in turn
+    for row in sorted(layout.index[node_id] for node_id in expanded if node_id in layout.index):
+        if shown[row]:
+            lo, hi = np.searchsorted(parent, [row, row + 1])
+            shown[lo:hi] = True
+    rows = np.flatnonzero(shown)
+
+    # Children of a row are a contiguous run, so one cumulative sum over the
+    # subtree sizes of hidden rows counts what each row's children hide
+    hidden_below = np.concatenate(([0], np.cumsum(np.where(shown, 0, layout.subtree_size))))
+    lo = np.searchsorted(parent, rows, side='left')
+    hi = np.searchsorted(parent, rows, side='right')
+    return rows, hidden_below[hi] - hidden_below[lo]
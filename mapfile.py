@@ -0,0 +1,253 @@
+# frontend/mapfile.py
+"""
+Mind map files that can be opened again without regenerating anything.
+
+A map file is a JSON document holding the graph, its radial layout and
+metadata, usually gzip-compressed (``.lrmap``). Node ids and labels are
+parallel arrays and edges and the layout refer to nodes by position, so a
+file is a fraction of the size of the GPT output format. Loading a file
+restores the ``MindMap`` and its ``RadialLayout`` directly; the app draws
+it without a model request or a layout pass.
+
+Documents carry ``FORMAT_VERSION``. Readers accept any version up to their
+own, and bump it when the document structure changes. Plain JSON in the GPT
+output format (the app's "Download Mindmap as JSON") loads too, with the
+layout computed on load.
+
+Document structure (version 1)::
+
+    {
+        "format": "lightningroute-mindmap",
+        "version": 1,
+        "metadata": {"title": ..., "created_at": ..., ...},
+        "root": 0,                      # position of the root node
+        "ids": [...], "labels": [...],  # one entry per node
+        "edges": [s0, t0, s1, t1, ...], # node positions, flattened pairs
+        "layout": {
+            "kind": "radial",
+            "order": [...],             # node position of each layout row
+            "parent": [...],            # row of the tree parent, -1 for the root
+            "x": [...], "y": [...],
+            "dropped": [...]            # left-out edges, flattened pairs
+        }
+    }
+"""
+import gzip
+import json
+import time
+import zlib
+from collections import namedtuple
+
+import deps
+import tracing
+from graph import Edge, MindMap, MindMapError, Node
+from layout import RadialLayout, radial_layout
+
+FORMAT = 'lightningroute-mindmap'
+FORMAT_VERSION = 1
+EXTENSION = 'lrmap'
+MIME_TYPE = 'application/gzip'
+# Coordinates are stored to this many decimals; plenty for a plot
+COORDINATE_DECIMALS = 4
+GZIP_MAGIC = b'\x1f\x8b'
+# Largest document accepted, after decompression; a 10,000-node map is under 1 MB
+MAX_DOCUMENT_BYTES = 32 * 1024 * 1024
+
+MapFile = namedtuple('MapFile', ['mindmap', 'layout', 'metadata'])
+MapFile.__doc__ = """
+Contents of a mind map file.
+
+Attributes:
+    mindmap (MindMap): Validated mind map
+    layout (RadialLayout): Stored layout, or one computed on load for files
+        without a usable layout
+    metadata (dict): Title, creation time and whatever else was saved
+"""
+
+
+class MapFileError(MindMapError):
+    """Raised when a file is not a mind map file this version can read."""
+
+
+def _is_position(value, count):
+    """Whether ``value`` is an integer index into ``count`` items, counted from the front."""
+    return type(value) is int and 0 <= value < count
+
+
+def _pairs(flat):
+    return zip(flat[0::2], flat[1::2])
+
+
+def dump_mindmap(mindmap, layout=None, metadata=None, compress=True):
+    """
+    Serialize a mind map with its layout.
+
+    Args:
+        mindmap (MindMap): Mind map to save
+        layout (RadialLayout): Its layout; computed if omitted
+        metadata (dict): Extra JSON-serializable metadata to store
+        compress (bool): gzip the document
+
+    Returns:
+        bytes: File contents
+    """
+    np = deps.load('numpy')
+    layout = layout if layout is not None else radial_layout(mindmap)
+    with tracing.span('save', nodes=len(mindmap.nodes), edges=len(mindmap.edges)) as sizes:
+        index = mindmap.index
+        document = {
+            'format': FORMAT,
+            'version': FORMAT_VERSION,
+            'metadata': {
+                'title': mindmap.label(mindmap.root),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'nodes': len(mindmap.nodes),
+                'edges': len(mindmap.edges),
+                **(metadata or {}),
+            },
+            'root': index[mindmap.root],
+            'ids': [node.id for node in mindmap.nodes],
+            'labels': [node.label for node in mindmap.nodes],
+            'edges': [position for edge in mindmap.edges for position in (index[edge.source], index[edge.target])],
+            'layout': {
+                'kind': 'radial',
+                'order': [index[node_id] for node_id in layout.ids],
+                'parent': layout.parent.tolist(),
+                'x': np.round(layout.x, COORDINATE_DECIMALS).tolist(),
+                'y': np.round(layout.y, COORDINATE_DECIMALS).tolist(),
+                'dropped': [position for edge in layout.dropped_edges
+                            for position in (index[edge.source], index[edge.target])],
+            },
+        }
+        data = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if compress:
+            # mtime=0 keeps the output identical for identical maps
+            data = gzip.compress(data, compresslevel=6, mtime=0)
+        sizes['bytes'] = len(data)
+    return data
+
+
+def load_mindmap(data):
+    """
+    Read a mind map file, or a mind map in the GPT output format.
+
+    Args:
+        data (bytes): File contents, compressed or not
+
+    Returns:
+        MapFile: The mind map, its layout and metadata
+
+    Raises:
+        MapFileError: If the data is not a readable mind map file
+        MindMapError: If the mind map in it has no usable nodes
+    """
+    with tracing.span('load', bytes=len(data)) as sizes:
+        if bytes(data[:2]) == GZIP_MAGIC:
+            # Inflate at most one byte past the limit, so a small upload
+            # cannot expand into gigabytes; output grows with the data
+            decompressor = zlib.decompressobj(wbits=31)
+            try:
+                data = decompressor.decompress(data, MAX_DOCUMENT_BYTES + 1)
+            except zlib.error as e:
+                raise MapFileError(f"Not a mind map file: {e}") from e
+            if not decompressor.eof and len(data) <= MAX_DOCUMENT_BYTES:
+                raise MapFileError("Not a mind map file: compressed data ends early")
+        if len(data) > MAX_DOCUMENT_BYTES:
+            raise MapFileError(f"Mind map file is larger than {MAX_DOCUMENT_BYTES // (1024 * 1024)} MB")
+        try:
+            document = json.loads(bytes(data).decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise MapFileError(f"Not a mind map file: {e}") from e
+        if not isinstance(document, dict):
+            raise MapFileError("Not a mind map file")
+
+        if document.get('format') != FORMAT:
+            # A map downloaded as JSON, or raw model output
+            mindmap = MindMap.from_dict(document)
+            sizes['stored_layout'] = False
+            return MapFile(mindmap, radial_layout(mindmap), {'title': mindmap.label(mindmap.root)})
+        version = document.get('version')
+        if not isinstance(version, int) or version > FORMAT_VERSION:
+            raise MapFileError(f"Mind map file version {version} is newer than this app supports")
+
+        mindmap = _read_graph(document)
+        layout = _read_layout(document.get('layout'), mindmap)
+        sizes['stored_layout'] = layout is not None
+        if layout is None:
+            layout = radial_layout(mindmap)
+        sizes['nodes'] = len(mindmap.nodes)
+    return MapFile(mindmap, layout, document.get('metadata') or {})
+
+
+def _read_graph(document):
+    """Check the graph arrays and build the ``MindMap`` without revalidating every record."""
+    np = deps.load('numpy')
+    try:
+        ids = [str(node_id) for node_id in document['ids']]
+        labels = [str(label) for label in document['labels']]
+        root = document['root']
+        pairs = np.asarray(document['edges'])
+        if pairs.size and pairs.dtype.kind != 'i':
+            raise ValueError("edge positions must be integers")
+        pairs = pairs.astype(np.int64).reshape(-1, 2)
+        n = len(ids)
+        if len(labels) != n or not n or len(set(ids)) != n:
+            raise ValueError("node ids must be unique and match the labels")
+        if type(root) is not int or not 0 <= root < n or (pairs.size and not (0 <= pairs.min() <= pairs.max() < n)):
+            raise ValueError("node positions out of range")
+        if (pairs[:, 0] == pairs[:, 1]).any() or len(np.unique(pairs[:, 0] * n + pairs[:, 1])) != len(pairs):
+            raise ValueError("repeated edges or self-loops")
+    except (KeyError, TypeError, ValueError) as e:
+        raise MapFileError(f"Malformed mind map file: {e}") from e
+    nodes = [Node(node_id, label) for node_id, label in zip(ids, labels)]
+    edges = [Edge(ids[source], ids[target]) for source, target in pairs.tolist()]
+    return MindMap(nodes, edges, ids[root])
+
+
+def _read_layout(stored, mindmap):
+    """Rebuild the stored layout, or return None if it is missing or does not fit the graph."""
+    np = deps.load('numpy')
+    if not isinstance(stored, dict) or stored.get('kind') != 'radial':
+        return None
+    try:
+        order = stored['order']
+        parent = stored['parent']
+        n = len(order)
+        if not n or len(parent) != n or len(stored['x']) != n or len(stored['y']) != n \
+                or order[0] != mindmap.index[mindmap.root] or parent[0] != -1:
+            return None
+        if not all(_is_position(position, len(mindmap.nodes)) for position in order):
+            return None
+        ids = [mindmap.nodes[position].id for position in order]
+        depth = [0] * n
+        for row in range(1, n):
+            # Parents precede their children and never decrease
+            if not (_is_position(parent[row], row) and parent[row - 1] <= parent[row]):
+                return None
+            depth[row] = depth[parent[row]] + 1
+        subtree_size = [1] * n
+        for row in range(n - 1, 0, -1):
+            subtree_size[parent[row]] += subtree_size[row]
+        dropped_positions = stored.get('dropped') or []
+        if len(dropped_positions) % 2 or not all(_is_position(position, len(mindmap.nodes))
+                                                  for position in dropped_positions):
+            return None
+        dropped = [Edge(mindmap.nodes[source].id, mindmap.nodes[target].id)
+                   for source, target in _pairs(dropped_positions)]
+        x = np.asarray(stored['x'], dtype=float)
+        y = np.asarray(stored['y'], dtype=float)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+    index = {node_id: row for row, node_id in enumerate(ids)}
+    if len(index) != n:
+        return None
+    return RadialLayout(
+        ids=ids,
+        index=index,
+        x=x,
+        y=y,
+        depth=np.array(depth, dtype=np.intp),
+        parent=np.array(parent, dtype=np.intp),
+        subtree_size=np.array(subtree_size, dtype=np.intp),
+        dropped_edges=dropped,
+    )
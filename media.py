@@ -0,0 +1,107 @@
+# frontend/media.py
+"""
+Audio decoding through an ffmpeg pipe.
+
+Uploaded audio and video is handed to ffmpeg without temporary copies. The
+upload is written to ffmpeg's stdin through a memoryview, and ffmpeg
+writes 16 kHz mono 16-bit PCM, the format speech recognition works on, to
+its stdout. Two kinds of upload are spooled to a temporary file first:
+uploads above ``SPOOL_BYTES``, and MP4 files whose index follows the
+media data, because ffmpeg has to seek to read those.
+
+Environment:
+    LIGHTNINGROUTE_MEDIA_SPOOL_MB: Uploads larger than this are decoded
+        from a temporary file (default 64)
+"""
+import os
+import subprocess
+import tempfile
+
+import deps
+
+SAMPLE_RATE = 16_000
+SAMPLE_WIDTH = 2
+FFMPEG = 'ffmpeg'
+SPOOL_BYTES = int(float(os.environ.get('LIGHTNINGROUTE_MEDIA_SPOOL_MB', '64')) * 1024 * 1024)
+
+
+def _index_after_media(view):
+    """Return whether an MP4 file's 'moov' box comes after its 'mdat' box."""
+    if bytes(view[4:8]) != b'ftyp':
+        return False
+    offset = 0
+    while offset + 8 <= len(view):
+        size = int.from_bytes(view[offset:offset + 4], 'big')
+        kind = bytes(view[offset + 4:offset + 8])
+        if kind == b'moov':
+            return False
+        if kind == b'mdat':
+            return True
+        if size == 1 and offset + 16 <= len(view):
+            size = int.from_bytes(view[offset + 8:offset + 16], 'big')
+        if size < 8:
+            break
+        offset += size
+    return False
+
+
+def decode_pcm(source, sample_rate=SAMPLE_RATE, work_dir=None):
+    """
+    Decode the audio track of a media file to mono 16-bit PCM.
+
+    Args:
+        source: Path of a media file, or its contents as bytes or another
+            bytes-like object, which is not copied
+        sample_rate (int): Output sample rate in Hz
+        work_dir (str): Directory for a spooled copy of large uploads;
+            defaults to the system temporary directory
+
+    Returns:
+        bytes: Little-endian 16-bit samples
+
+    Raises:
+        ValueError: If ffmpeg cannot find or decode an audio track
+        RuntimeError: If ffmpeg is not installed
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return _run_ffmpeg(os.fspath(source), None, sample_rate)
+    view = memoryview(source)
+    if view.nbytes <= SPOOL_BYTES and not _index_after_media(view):
+        return _run_ffmpeg('pipe:0', view, sample_rate)
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        path = os.path.join(tmp_dir, 'upload')
+        with open(path, 'wb') as f:
+            f.write(view)
+        return _run_ffmpeg(path, None, sample_rate)
+
+
+def _run_ffmpeg(input_arg, input_data, sample_rate):
+    command = [FFMPEG, '-hide_banner', '-loglevel', 'error', '-i', input_arg,
+               '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1']
+    try:
+        # communicate() feeds stdin from a memoryview of the input, while
+        # reading stdout, so neither pipe can fill up and block
+        result = subprocess.run(command, input=input_data,
+                                stdin=subprocess.DEVNULL if input_data is None else None,
+                                capture_output=True)
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpeg is required to read audio and video files") from e
+    if result.returncode != 0:
+        errors = result.stderr.decode(errors='replace').strip().splitlines()
+        raise ValueError(f"Cannot decode the audio: {errors[-1] if errors else 'ffmpeg failed'}")
+    return result.stdout
+
+
+def decode_audio(source, sample_rate=SAMPLE_RATE, work_dir=None):
+    """
+    Decode the audio track of a media file into a mono ``pydub.AudioSegment``.
+
+    Args:
+        (as for ``decode_pcm``)
+
+    Returns:
+        pydub.AudioSegment: Audio at ``sample_rate``
+    """
+    pydub = deps.load('pydub')
+    pcm = decode_pcm(source, sample_rate, work_dir)
+    return pydub.AudioSegment(data=pcm, sample_width=SAMPLE_WIDTH, frame_rate=sample_rate, channels=1)
@@ -0,0 +1,192 @@
+# frontend/ocr.py
+"""
+Process-wide EasyOCR engine.
+
+Loading an EasyOCR reader costs seconds and hundreds of MB, so readers are
+built lazily, once per language set, and shared by every session in the
+process. Inference is capped at ``MAX_CONCURRENT_OCR`` concurrent calls so
+parallel users don't multiply peak memory.
+
+``prepare_image`` readies photos and scans for OCR first. It applies the
+EXIF orientation and converts to grayscale. It shrinks the image to at
+most ``OCR_DPI`` for a page-sized original and straightens skewed text
+lines. A 12-megapixel phone photo becomes about a quarter of its pixels,
+and recognition time scales with the pixel count.
+
+Environment:
+    LIGHTNINGROUTE_OCR_WARMUP: "1" to load the default reader in the
+        background when the server starts
+    LIGHTNINGROUTE_OCR_CONCURRENCY: Maximum concurrent ``readtext`` calls
+        (default 1)
+    LIGHTNINGROUTE_OCR_DPI: Resolution images are reduced to before OCR
+        (default 200)
+"""
+import logging
+import os
+import threading
+
+import deps
+import tracing
+
+DEFAULT_LANGUAGES = ('en', 'ch_sim')
+WARM_UP_AT_STARTUP = os.environ.get('LIGHTNINGROUTE_OCR_WARMUP', '0') == '1'
+MAX_CONCURRENT_OCR = max(1, int(os.environ.get('LIGHTNINGROUTE_OCR_CONCURRENCY', '1')))
+OCR_DPI = int(os.environ.get('LIGHTNINGROUTE_OCR_DPI', '200'))
+# Long side of an A4 page in inches; photos carry no usable DPI, so they
+# are assumed to show one page
+PAGE_INCHES = 11.7
+MAX_SKEW_DEGREES = 10
+# Skew is estimated on a copy no larger than this
+SKEW_SAMPLE_SIDE = 1000
+SKEW_SAMPLE_POINTS = 200_000
+
+logger = logging.getLogger(__name__)
+
+_readers = {}
+_readers_lock = threading.Lock()
+_build_locks = {}
+_inference_slots = threading.BoundedSemaphore(MAX_CONCURRENT_OCR)
+_warm_up_started = False
+
+
+def get_reader(languages=DEFAULT_LANGUAGES):
+    """
+    Return the shared EasyOCR reader for a language set, loading it on first use.
+
+    Concurrent first calls for the same languages wait for a single load.
+
+    Args:
+        languages (iterable): EasyOCR language codes
+
+    Returns:
+        easyocr.Reader: Reader shared across sessions
+    """
+    key = tuple(languages)
+    reader = _readers.get(key)
+    if reader is not None:
+        return reader
+
+    with _readers_lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+    with build_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            easyocr = deps.load('easyocr')
+            logger.info("Loading EasyOCR reader for %s", key)
+            reader = easyocr.Reader(list(key), gpu=False)
+            _readers[key] = reader
+    return reader
+
+
+def read_text(image, languages=DEFAULT_LANGUAGES):
+    """
+    Run OCR on an image and return the recognized lines.
+
+    Args:
+        image (numpy.ndarray): Image pixels
+        languages (iterable): EasyOCR language codes
+
+    Returns:
+        str: Recognized text, one detected line per row
+    """
+    with tracing.span('ocr', pixels=int(image.shape[0] * image.shape[1])) as sizes:
+        reader = get_reader(languages)
+        with _inference_slots:
+            results = reader.readtext(image)
+        sizes['lines'] = len(results)
+    return "\n".join(item[1] for item in results)
+
+
+def estimate_skew(pixels, max_degrees=MAX_SKEW_DEGREES):
+    """
+    Estimate how far the text lines of a page are rotated.
+
+    Dark pixels are projected onto the vertical axis along each candidate
+    angle; the angle along which the projection is most peaked, that is
+    where every text line falls into few rows, is the skew. Candidates are
+    searched in 1 degree steps, then in 0.1 degree steps around the best.
+
+    Args:
+        pixels (numpy.ndarray): Grayscale pixels
+        max_degrees (float): Largest skew considered, either way
+
+    Returns:
+        float: Counter-clockwise rotation in degrees that levels the lines
+    """
+    np = deps.load('numpy')
+    step = max(1, max(pixels.shape) // SKEW_SAMPLE_SIDE)
+    sample = pixels[::step, ::step].astype(np.float32)
+    ys, xs = np.nonzero(sample < sample.mean() - sample.std())
+    if len(ys) < 100:
+        return 0.0
+    thin = max(1, len(ys) // SKEW_SAMPLE_POINTS)
+    ys, xs = ys[::thin].astype(np.float64), xs[::thin].astype(np.float64)
+
+    def peakedness(degrees):
+        rows = np.rint(ys - xs * np.tan(np.radians(degrees))).astype(np.intp)
+        counts = np.bincount(rows - rows.min()).astype(np.float64)
+        return counts @ counts
+
+    best = max(np.arange(-max_degrees, max_degrees + 0.5, 1.0), key=peakedness)
+    best = max(np.arange(best - 1, best + 1.05, 0.1), key=peakedness)
+    return float(np.clip(best, -max_degrees, max_degrees))
+
+
+def prepare_image(image, dpi=OCR_DPI):
+    """
+    Ready a photo or scan for OCR.
+
+    Applies the EXIF orientation, converts to grayscale, shrinks the image
+    so a page-sized original is at most ``dpi`` (JPEGs are decoded at the
+    reduced size directly) and rotates skewed text lines level.
+
+    Args:
+        image (PIL.Image.Image): Opened image, not yet loaded
+        dpi (int): Target resolution
+
+    Returns:
+        PIL.Image.Image: Grayscale image
+    """
+    Image = deps.load('PIL.Image')
+    ImageOps = deps.load('PIL.ImageOps')
+    np = deps.load('numpy')
+    with tracing.span('preprocess', pixels=image.width * image.height) as sizes:
+        limit = round(PAGE_INCHES * dpi)
+        source_dpi = image.info.get('dpi', (0, 0))[0]
+        if source_dpi and source_dpi > dpi:
+            limit = min(limit, round(max(image.size) * dpi / source_dpi))
+        if max(image.size) > limit:
+            scale = limit / max(image.size)
+            image.draft('L', (round(image.width * scale), round(image.height * scale)))
+        image = ImageOps.exif_transpose(image).convert('L')
+        if max(image.size) > limit:
+            image.thumbnail((limit, limit), Image.LANCZOS)
+        skew = estimate_skew(np.asarray(image))
+        if abs(skew) >= 0.1:
+            image = image.rotate(skew, resample=Image.BICUBIC, expand=True, fillcolor=255)
+        sizes['output_pixels'] = image.width * image.height
+        sizes['skew'] = round(skew, 1)
+    return image
+
+
+def start_warm_up(languages=DEFAULT_LANGUAGES):
+    """
+    Load the reader for ``languages`` in a background thread.
+
+    Only the first call per process starts a thread; later calls return
+    immediately. A failed warm-up is logged and the load is retried on the
+    first real request.
+    """
+    global _warm_up_started
+    with _readers_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+
+    def warm_up():
+        try:
+            get_reader(languages)
+        except Exception:
+            logger.exception("EasyOCR warm-up failed")
+
+    threading.Thread(target=warm_up, name="ocr-warm-up", daemon=True).start()
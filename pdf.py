@@ -0,0 +1,178 @@
+# frontend/pdf.py
+"""
+Parallel, streaming PDF text extraction.
+
+Pages are parsed in a process pool in batches and yielded in page order as
+soon as each batch is ready. Pages without a text layer (scans) fall back
+to OCR of the images embedded in the page, which runs in the main process
+so the shared EasyOCR reader is loaded only once. A page cap, an output
+size cap and a per-worker memory limit keep one huge upload from stalling
+the server.
+
+Environment:
+    LIGHTNINGROUTE_PDF_MAX_PAGES: Pages read per document (default 300)
+    LIGHTNINGROUTE_PDF_WORKERS: Worker processes (default: CPU count, at most 4)
+    LIGHTNINGROUTE_PDF_WORKER_MEMORY_MB: Address space limit per worker
+        process on POSIX systems (default 1024)
+"""
+import io
+import logging
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import deps
+import tracing
+
+MAX_PAGES = int(os.environ.get('LIGHTNINGROUTE_PDF_MAX_PAGES', '300'))
+MAX_WORKERS = max(1, int(os.environ.get('LIGHTNINGROUTE_PDF_WORKERS', min(4, os.cpu_count() or 1))))
+WORKER_MEMORY_MB = int(os.environ.get('LIGHTNINGROUTE_PDF_WORKER_MEMORY_MB', '1024'))
+MAX_CHARS = 2_000_000
+# Smaller documents are parsed in-process; the pool costs more than it saves
+PARALLEL_MIN_PAGES = 16
+BATCH_PAGES = 8
+
+PdfPage = namedtuple('PdfPage', ['number', 'count', 'text', 'source'])
+PdfPage.__doc__ = """
+Text of one PDF page.
+
+Attributes:
+    number (int): 1-based page number
+    count (int): Number of pages that will be read from the document
+    text (str): Extracted text
+    source (str): 'text' for the text layer, 'ocr' for OCR output, or
+        'empty' if neither produced any text
+"""
+
+logger = logging.getLogger(__name__)
+
+_worker_reader = None
+
+
+def _init_worker(data, memory_mb):
+    global _worker_reader
+    if memory_mb:
+        try:
+            import resource
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+    PyPDF2 = deps.load('PyPDF2')
+    _worker_reader = PyPDF2.PdfReader(io.BytesIO(data))
+
+
+def _extract_batch(start, stop):
+    texts = []
+    for number in range(start, stop):
+        try:
+            texts.append(_worker_reader.pages[number].extract_text() or "")
+        except MemoryError:
+            texts.append(None)
+    return texts
+
+
+def _ocr_page(page):
+    import ocr
+    np = deps.load('numpy')
+    Image = deps.load('PIL.Image')
+    texts = []
+    for image in page.images:
+        pixels = np.asarray(ocr.prepare_image(Image.open(io.BytesIO(image.data))))
+        texts.append(ocr.read_text(pixels))
+    return "\n".join(filter(None, texts))
+
+
+def _page_texts(data, reader, page_count, max_workers):
+    """Yield the text layer of each page in order; None marks a failed page."""
+    if page_count < PARALLEL_MIN_PAGES or max_workers == 1:
+        for number in range(page_count):
+            yield reader.pages[number].extract_text() or ""
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, initializer=_init_worker,
+                             initargs=(data, WORKER_MEMORY_MB)) as pool:
+        ranges = [(start, min(start + BATCH_PAGES, page_count)) for start in range(0, page_count, BATCH_PAGES)]
+        batches = [pool.submit(_extract_batch, start, stop) for start, stop in ranges]
+        try:
+            for (start, stop), batch in zip(ranges, batches):
+                try:
+                    yield from batch.result()
+                except BrokenProcessPool:
+                    # A worker died, typically at the memory limit
+                    yield from [None] * (stop - start)
+        finally:
+            for batch in batches:
+                batch.cancel()
+
+
+def iter_pdf_pages(data, max_pages=MAX_PAGES, max_chars=MAX_CHARS, max_workers=MAX_WORKERS, ocr_fallback=True):
+    """
+    Extract the text of a PDF page by page, in order.
+
+    Args:
+        data (bytes): PDF file contents
+        max_pages (int): Pages to read; later pages are skipped
+        max_chars (int): Stop once this many characters were extracted
+        max_workers (int): Worker processes for large documents
+        ocr_fallback (bool): OCR pages that have no text layer
+
+    Yields:
+        PdfPage: One record per page read
+    """
+    PyPDF2 = deps.load('PyPDF2')
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    total_pages = len(reader.pages)
+    page_count = min(total_pages, max_pages)
+    if page_count < total_pages:
+        logger.warning("PDF has %d pages; only the first %d are read", total_pages, page_count)
+
+    chars = 0
+    for number, text in enumerate(_page_texts(data, reader, page_count, max_workers), 1):
+        source = 'text'
+        if text is None:
+            logger.warning("Page %d could not be parsed within the worker memory limit", number)
+            text, source = "", 'empty'
+        elif not text.strip():
+            text, source = "", 'empty'
+            if ocr_fallback:
+                try:
+                    text = _ocr_page(reader.pages[number - 1])
+                except Exception:
+                    logger.exception("OCR of page %d failed", number)
+                if text.strip():
+                    source = 'ocr'
+            if source == 'empty':
+                logger.warning("Page %d has no text layer and no readable images", number)
+        yield PdfPage(number, page_count, text, source)
+        chars += len(text)
+        if chars >= max_chars:
+            logger.warning("Stopped reading the PDF after page %d (%d characters)", number, chars)
+            break
+
+
+def extract_pdf_text(data, progress=None, **kwargs):
+    """
+    Return the text of a PDF, joined once at the end.
+
+    Args:
+        data (bytes): PDF file contents
+        progress (callable): Optional ``progress(fraction)`` callback
+        **kwargs: Passed to ``iter_pdf_pages``
+
+    Returns:
+        str: Page texts separated by newlines
+    """
+    texts = []
+    with tracing.span('pdf', bytes=len(data)) as sizes:
+        sizes['pages'] = sizes['ocr_pages'] = 0
+        for page in iter_pdf_pages(data, **kwargs):
+            texts.append(page.text)
+            sizes['pages'] += 1
+            sizes['ocr_pages'] += page.source == 'ocr'
+            if progress:
+                progress(page.number / page.count)
+    return "\n".join(texts)
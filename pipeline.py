@@ -0,0 +1,299 @@
+# frontend/pipeline.py
+"""
+Headless document-to-mind-map pipeline and batch command line.
+
+Runs the same steps as the app without Streamlit: extract the text of a
+file, generate a mind map, and write it out as JSON, a map file the app
+can open, an image, HTML, a folder tree or a ZIP archive. The batch
+command handles many files at once. Extraction runs in a process pool,
+and mind maps are generated from asyncio tasks with a cap on the model
+requests in flight.
+
+Every finished file is appended to ``manifest.jsonl`` in the output
+directory. A rerun skips files that are unchanged since then and whose
+outputs all exist, so an interrupted batch resumes where it stopped.
+
+Usage:
+    python -m pipeline lectures/ -o maps/ [--formats json png dirs] [--workers 4] [--concurrency 4]
+    python -m pipeline "notes/**/*.pdf" -o maps/ --deterministic
+
+The OpenAI API key is read from ``OPENAI_API_KEY``.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import mimetypes
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from export import FORMATS, create_directory_from_mindmap, export_figure, mindmap_key, zip_mindmap_directories
+from extraction import detect_kind, extract_text
+from generation import generate_mindmap, openai_completion
+from graph import MindMap
+from mapfile import EXTENSION, dump_mindmap
+
+OUTPUT_FORMATS = ('json', 'lrmap', 'png', 'svg', 'html', 'dirs', 'zip')
+MANIFEST = 'manifest.jsonl'
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+MAX_CONCURRENCY = 4
+
+logger = logging.getLogger(__name__)
+
+
+def guess_mime_type(path):
+    """Return the MIME type implied by a file name, or "" if unknown."""
+    return mimetypes.guess_type(path)[0] or ""
+
+
+def find_inputs(patterns):
+    """
+    Expand directories and glob patterns into supported input files.
+
+    Args:
+        patterns (list): Directories (searched recursively), files or glob
+            patterns; ``**`` matches any number of directories
+
+    Returns:
+        list: ``(path, name)`` tuples sorted by path, where ``name`` is the
+        path relative to its directory or pattern root, used to name the
+        outputs; it keeps the extension, so ``a.pdf`` and ``a.docx`` do
+        not write to the same files
+    """
+    inputs = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            root = pattern
+            paths = (os.path.join(folder, file) for folder, _, files in os.walk(pattern) for file in files)
+        else:
+            paths = glob.glob(pattern, recursive=True)
+            root = os.path.dirname(pattern.split('*', 1)[0]) or '.'
+        for path in paths:
+            if os.path.isfile(path) and detect_kind(path, guess_mime_type(path)) is not None:
+                inputs.setdefault(path, os.path.relpath(path, root))
+    return sorted(inputs.items())
+
+
+def extract_file(path, pdf_workers=None):
+    """Return the text of a document on disk; arguments as for ``extract_text``."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return extract_text(data, os.path.basename(path), guess_mime_type(path), pdf_workers=pdf_workers)
+
+
+def mindmap_from_text(text, client=None, deterministic=False):
+    """
+    Generate a validated mind map for a text.
+
+    Args:
+        text (str): Text to analyze
+        client (callable): Completion client, see ``generation``
+        deterministic (bool): Sample at temperature 0
+
+    Returns:
+        MindMap: Generated mind map
+    """
+    return MindMap.from_dict(generate_mindmap(text, client=client, deterministic=deterministic))
+
+
+def write_outputs(mindmap, base_path, formats):
+    """
+    Write a mind map in several formats next to each other.
+
+    Args:
+        mindmap (MindMap): Mind map to write
+        base_path (str): Output path without extension; ``dirs`` creates
+            the folder tree inside a directory of this name
+        formats (iterable): Names from ``OUTPUT_FORMATS``
+
+    Returns:
+        dict: Format name -> written path
+    """
+    os.makedirs(os.path.dirname(base_path) or '.', exist_ok=True)
+    outputs = {}
+    fig = None
+    for fmt in formats:
+        if fmt == 'json':
+            path = f"{base_path}.json"
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(mindmap.to_dict(), f, ensure_ascii=False)
+        elif fmt == 'lrmap':
+            path = f"{base_path}.{EXTENSION}"
+            with open(path, 'wb') as f:
+                f.write(dump_mindmap(mindmap))
+        elif fmt == 'dirs':
+            path = create_directory_from_mindmap(mindmap, base_path)
+        elif fmt == 'zip':
+            path = f"{base_path}.zip"
+            with open(path, 'wb') as f:
+                f.write(zip_mindmap_directories(mindmap))
+        else:
+            from utils import create_mindmap_figure
+            fig = fig or create_mindmap_figure(mindmap)
+            path = f"{base_path}.{FORMATS[fmt.upper()][0]}"
+            with open(path, 'wb') as f:
+                f.write(export_figure(fig, fmt.upper(), mindmap_key(mindmap)))
+        outputs[fmt] = path
+    return outputs
+
+
+def bounded(client, limit):
+    """Wrap a completion client so at most ``limit`` requests run at once."""
+    slots = threading.BoundedSemaphore(limit)
+
+    def bounded_client(messages, **kwargs):
+        with slots:
+            return client(messages, **kwargs)
+    return bounded_client
+
+
+def load_manifest(out_dir):
+    """
+    Return the latest manifest entry per source path in ``out_dir``.
+
+    Lines that do not decode, such as one cut off by an interrupted run,
+    are logged and skipped; their files are processed again.
+    """
+    entries = {}
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entries[entry['source']] = entry
+                except (ValueError, TypeError, KeyError):
+                    logger.warning("Skipped unreadable line %d of %s", number, MANIFEST)
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _end_last_line(path):
+    """
+    Terminate a manifest line left unfinished by an interrupted run.
+
+    Otherwise the next appended entry would continue the broken line and be
+    skipped along with it on the following run.
+    """
+    try:
+        with open(path, 'rb+') as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+    except FileNotFoundError:
+        pass
+
+
+def is_done(entry, path, formats):
+    """Whether a manifest entry covers the current file and every requested output."""
+    if entry is None:
+        return False
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # Gone since it was listed; processing it reports the failure
+        return False
+    return (entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+            and all(fmt in entry['outputs'] and os.path.exists(entry['outputs'][fmt]) for fmt in formats))
+
+
+async def run_batch(inputs, out_dir, formats=('json',), workers=MAX_WORKERS, concurrency=MAX_CONCURRENCY,
+                    deterministic=False, client=None):
+    """
+    Turn documents into mind maps, skipping those already done.
+
+    Args:
+        inputs (list): ``(path, name)`` tuples, see ``find_inputs``
+        out_dir (str): Directory for outputs and the manifest
+        formats (iterable): Names from ``OUTPUT_FORMATS``
+        workers (int): Extraction processes
+        concurrency (int): Maximum model requests in flight
+        deterministic (bool): Sample at temperature 0
+        client (callable): Completion client; defaults to ``openai_completion``
+
+    Returns:
+        dict: Counts of 'done', 'skipped' and 'failed' files
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    todo = [(path, name) for path, name in inputs
+            if not is_done(manifest.get(os.path.abspath(path)), path, formats)]
+    counts = {'done': 0, 'skipped': len(inputs) - len(todo), 'failed': 0}
+    if not todo:
+        return counts
+
+    loop = asyncio.get_running_loop()
+    client = bounded(client or openai_completion, concurrency)
+    generating = asyncio.Semaphore(concurrency)
+    context = multiprocessing.get_context("spawn")
+    _end_last_line(os.path.join(out_dir, MANIFEST))
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pipeline") as threads, \
+            open(os.path.join(out_dir, MANIFEST), 'a', encoding='utf-8') as manifest_file:
+
+        async def process(path, name):
+            start = time.perf_counter()
+            try:
+                stat = os.stat(path)
+                # Files are already spread over processes; PDFs are parsed in-process
+                text = await loop.run_in_executor(pool, extract_file, path, 1)
+                async with generating:
+                    mindmap = await loop.run_in_executor(threads, mindmap_from_text, text, client, deterministic)
+                outputs = await loop.run_in_executor(threads, write_outputs, mindmap,
+                                                     os.path.join(out_dir, name), formats)
+            except Exception:
+                logger.exception("Failed to process %s", path)
+                counts['failed'] += 1
+                return
+            manifest_file.write(json.dumps({
+                'source': os.path.abspath(path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'outputs': outputs,
+                'nodes': len(mindmap.nodes),
+                'finished_at': time.time(),
+            }) + '\n')
+            manifest_file.flush()
+            counts['done'] += 1
+            print(f"[{counts['done'] + counts['failed']}/{len(todo)}] {path} "
+                  f"({len(mindmap.nodes)} nodes, {time.perf_counter() - start:.1f} s)", file=sys.stderr)
+
+        await asyncio.gather(*(process(path, name) for path, name in todo))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('inputs', nargs='+', help="Directories, files or glob patterns")
+    parser.add_argument('-o', '--output', required=True, help="Output directory")
+    parser.add_argument('--formats', nargs='+', choices=OUTPUT_FORMATS, default=['json'])
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="Extraction processes")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY, help="Model requests in flight")
+    parser.add_argument('--deterministic', action='store_true', help="Sample at temperature 0")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if not os.environ.get('OPENAI_API_KEY'):
+        parser.error("set OPENAI_API_KEY to the OpenAI API key")
+    inputs = find_inputs(args.inputs)
+    if not inputs:
+        parser.error("no supported files found")
+
+    counts = asyncio.run(run_batch(inputs, args.output, args.formats, args.workers, args.concurrency,
+                                   args.deterministic))
+    print(f"{counts['done']} done, {counts['skipped']} skipped, {counts['failed']} failed", file=sys.stderr)
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,10 @@
 #!/bin/bash
 
-# Update apt-get package list and install ffmpeg
-sudo apt-get update
-sudo apt-get install -y ffmpeg
+# Install ffmpeg once; later starts skip the slow apt-get run
+if ! command -v ffmpeg >/dev/null 2>&1; then
+    sudo apt-get update
+    sudo apt-get install -y ffmpeg
+fi
 
 # Configure Streamlit credentials
 mkdir -p ~/.streamlit/
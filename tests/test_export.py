@@ -0,0 +1,40 @@
+# frontend/tests/test_export.py
+"""Tests for exporting mind maps as folder trees and ZIP archives."""
+import io
+import os
+import zipfile
+
+from benchmarks.fixtures import synthetic_dag
+from export import MAX_NAME_LENGTH, create_directory_from_mindmap, directory_paths, sanitize_name, \
+    zip_mindmap_directories
+from graph import MindMap
+
+
+def test_sanitize_name_is_safe_on_every_platform():
+    assert sanitize_name('a/b: "c"?') == 'a_b_ _c__'
+    assert sanitize_name('  many\n spaces. ') == 'many spaces'
+    assert sanitize_name('...') == 'untitled'
+    assert sanitize_name('con.txt') == 'con.txt_'
+    assert len(sanitize_name('x' * 500)) == MAX_NAME_LENGTH
+
+
+def test_directory_paths_number_colliding_siblings_and_skip_second_parents():
+    mindmap = MindMap.from_dict({
+        'nodes': [{'id': 'root', 'label': 'Map'}, {'id': '1', 'label': 'Topic'}, {'id': '2', 'label': 'topic'},
+                  {'id': '3', 'label': 'Topic'}, {'id': '4', 'label': 'Leaf'}],
+        'edges': [{'from': 'root', 'to': '1'}, {'from': 'root', 'to': '2'}, {'from': 'root', 'to': '3'},
+                  {'from': '1', 'to': '4'}, {'from': '2', 'to': '4'}],
+    })
+    assert directory_paths(mindmap) == [
+        ('Map',), ('Map', 'Topic'), ('Map', 'topic (2)'), ('Map', 'Topic (3)'), ('Map', 'Topic', 'Leaf')]
+
+
+def test_zip_matches_the_folder_tree(tmp_path):
+    mindmap = MindMap.from_dict(synthetic_dag(300))
+    root = create_directory_from_mindmap(mindmap, str(tmp_path))
+    on_disk = {os.path.relpath(folder, tmp_path).replace(os.sep, '/') + '/' for folder, _, _ in os.walk(root)}
+    with zipfile.ZipFile(io.BytesIO(zip_mindmap_directories(mindmap))) as archive:
+        assert set(archive.namelist()) == on_disk
+    assert len(on_disk) == len(directory_paths(mindmap))
+    # Exporting again into the same place is harmless
+    assert create_directory_from_mindmap(mindmap, str(tmp_path)) == root
@@ -0,0 +1,120 @@
+# frontend/tests/test_generation.py
+"""Tests for merging partial mind maps and generating with a fake completion client."""
+import json
+
+from benchmarks.fixtures import fake_completion, lorem_text, model_response
+from generation import CHARS_PER_TOKEN, MAX_CHUNK_TOKENS, generate_mindmap, merge_mindmaps, normalize_text, \
+    parse_mindmap, split_sections, stream_sections
+from graph import MindMap
+from layout import radial_layout
+
+
+def reachable(graph):
+    """Number of nodes the radial layout places, i.e. reachable from the root."""
+    return len(radial_layout(MindMap.from_dict(graph)).ids)
+
+
+def test_merge_tolerates_missing_labels_and_malformed_nodes():
+    partials = [
+        {'nodes': [{'id': 'root', 'label': 'Main'}, {'id': '1'}], 'edges': [{'from': 'root', 'to': '1'}]},
+        {'nodes': [{'id': 'root', 'label': 'Second'}, "not a node", {'id': '2', 'label': 'Leaf'}],
+         'edges': [{'from': 'root', 'to': '2'}]},
+    ]
+    merged = merge_mindmaps(partials)
+    labels = {node['label'] for node in merged['nodes']}
+    assert labels == {'Main', '1', 'Second', 'Leaf'}
+    assert reachable(merged) == 4
+
+
+def test_merge_hangs_later_parts_off_a_first_root_not_called_root():
+    partials = [
+        {'nodes': [{'id': 'r', 'label': 'Main'}, {'id': 'a', 'label': 'A'}], 'edges': [{'from': 'r', 'to': 'a'}]},
+        {'nodes': [{'id': 's', 'label': 'Second'}, {'id': 'b', 'label': 'B'}], 'edges': [{'from': 's', 'to': 'b'}]},
+    ]
+    merged = merge_mindmaps(partials)
+    mindmap = MindMap.from_dict(merged)
+    assert mindmap.root == 'root'
+    assert mindmap.label('root') == 'Main'
+    assert not mindmap.warnings
+    assert reachable(merged) == 4
+
+
+def test_merge_skips_unusable_parts_and_merges_equal_labels():
+    partials = [
+        {'nodes': [{'id': 'root', 'label': 'Main'}, {'id': '1', 'label': 'Shared'}],
+         'edges': [{'from': 'root', 'to': '1'}]},
+        {'nodes': []},
+        {'nodes': [{'id': 'root', 'label': 'main'}, {'id': '1', 'label': ' shared '}],
+         'edges': [{'from': 'root', 'to': '1'}]},
+    ]
+    merged = merge_mindmaps(partials)
+    assert [node['id'] for node in merged['nodes']] == ['root', '0.1']
+    assert merged['edges'] == [{'from': 'root', 'to': '0.1'}]
+    assert merge_mindmaps(partials) == merged
+
+
+def test_parse_mindmap_accepts_missing_edges():
+    graph_data = parse_mindmap('{"nodes": [{"id": "root", "label": "x"}]}')
+    assert MindMap.from_dict(graph_data).nodes[0].label == 'x'
+
+
+def test_generate_short_text():
+    text = lorem_text(200)
+    graph = generate_mindmap(text, client=fake_completion, use_cache=False)
+    assert graph == generate_mindmap(text, client=fake_completion, use_cache=False)
+    assert reachable(graph) == len(graph['nodes'])
+
+
+def test_generate_long_text_merges_every_chunk():
+    text = lorem_text(30_000)
+    graph = generate_mindmap(text, client=fake_completion, max_chunk_tokens=2000, use_cache=False)
+    mindmap = MindMap.from_dict(graph)
+    assert not mindmap.warnings
+    assert reachable(graph) == len(graph['nodes'])
+    assert graph == generate_mindmap(text, client=fake_completion, max_chunk_tokens=2000, use_cache=False)
+
+
+def test_generate_long_text_with_odd_partials():
+    def client(messages, **kwargs):
+        # Roots named 'r' and nodes without labels, as models sometimes return
+        graph = json.loads(fake_completion(messages).split("```json\n")[1].split("\n```")[0])
+        rename = {'root': 'r'}
+        return model_response({
+            'nodes': [{'id': rename.get(node['id'], node['id'])} for node in graph['nodes']],
+            'edges': [{'from': rename.get(edge['from'], edge['from']), 'to': edge['to']} for edge in graph['edges']],
+        })
+
+    graph = generate_mindmap(lorem_text(30_000), client=client, max_chunk_tokens=2000, use_cache=False)
+    assert reachable(graph) == len(graph['nodes'])
+
+
+def edited(paragraphs, k, edit):
+    paragraphs = list(paragraphs)
+    paragraphs[k:k + 1] = edit(paragraphs[k])
+    return "\n\n".join(paragraphs)
+
+
+def test_split_sections_covers_the_text_within_the_budget():
+    text = normalize_text(lorem_text(30_000))
+    sections = split_sections(text)
+    assert "\n\n".join(sections) == text
+    assert 10 < len(sections) and all(0 < len(section) <= MAX_CHUNK_TOKENS * CHARS_PER_TOKEN for section in sections)
+
+
+def test_split_sections_edits_change_at_most_two_sections():
+    text = normalize_text(lorem_text(30_000))
+    sections = set(split_sections(text))
+    paragraphs = text.split("\n\n")
+    for k in range(0, len(paragraphs), 3):
+        for edit in (lambda p: [p + " An inserted sentence."], lambda p: [], lambda p: [p, "A new paragraph."]):
+            assert len(set(split_sections(edited(paragraphs, k, edit))) - sections) <= 2
+
+
+def test_stream_sections_regenerates_only_edited_sections():
+    text = lorem_text(30_000)
+    first = list(stream_sections(text, client=fake_completion, use_cache=False))[-1]
+    paragraphs = normalize_text(text).split("\n\n")
+    edited_text = edited(paragraphs, len(paragraphs) // 2, lambda p: [p + " An inserted sentence."])
+    second = list(stream_sections(edited_text, previous=first, client=fake_completion, use_cache=False))[-1]
+    assert 1 <= len(second.regenerated) <= 2
+    assert reachable(second.graph) == len(second.graph['nodes'])
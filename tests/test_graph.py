@@ -0,0 +1,79 @@
+# frontend/tests/test_graph.py
+"""Tests for parsing mind maps out of streamed and complete model responses."""
+import pytest
+
+from benchmarks.fixtures import model_response, synthetic_dag
+from graph import Edge, MindMap, MindMapError, MindmapStreamParser, Node, extract_graph_data
+
+
+def stream(text, size):
+    parser = MindmapStreamParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    return parser
+
+
+def test_stream_matches_the_whole_document_for_any_piece_size():
+    graph = synthetic_dag(60)
+    response = model_response(graph)
+    for size in (1, 7, 64, len(response)):
+        assert stream(response, size).graph() == graph
+
+
+def test_stream_reports_elements_as_their_closing_brace_arrives():
+    parser = MindmapStreamParser()
+    assert not parser.feed('```json\n{"nodes": [{"id": "root", "label": "a {b}')
+    assert parser.nodes == []
+    assert parser.feed('"}, {"id": "1"')
+    assert parser.nodes == [{'id': 'root', 'label': 'a {b}'}]
+    assert parser.feed('}], "edges": [{"from": "root", "to": "1"}')
+    assert parser.graph() == {'nodes': [{'id': 'root', 'label': 'a {b}'}, {'id': '1'}],
+                              'edges': [{'from': 'root', 'to': '1'}]}
+
+
+def test_stream_handles_escaped_quotes_and_brackets_in_strings():
+    response = r'{"nodes": [{"id": "root", "label": "say \"}]\" twice \\"}], "edges": []}'
+    assert stream(response, 3).nodes == [{'id': 'root', 'label': 'say "}]" twice \\'}]
+
+
+def test_stream_ignores_text_after_the_document_and_other_arrays():
+    response = ('Sure! {"title": ["x"], "nodes": [{"id": "root"}], "meta": [{"id": "skip"}]}\n'
+                'Also: {"nodes": [{"id": "late"}]}')
+    parser = stream(response, 5)
+    assert parser.nodes == [{'id': 'root'}]
+    assert parser.edges == []
+
+
+def test_stream_skips_a_malformed_element():
+    parser = stream('{"nodes": [{"id": root}, {"id": "root"}], "edges": [{"from": "root", "to": }]}', 4)
+    assert parser.graph() == {'nodes': [{'id': 'root'}], 'edges': []}
+
+
+def test_from_dict_drops_what_it_cannot_use():
+    mindmap = MindMap.from_dict({
+        'nodes': [{'id': 1, 'label': 'One'}, {'label': 'no id'}, {'id': 'root'}, {'id': '1', 'label': 'again'}],
+        'edges': [{'from': 'root', 'to': 1}, {'source': 'root', 'target': '1'}, {'from': '1', 'to': '1'},
+                  {'from': '1', 'to': 'missing'}, 'junk'],
+    })
+    assert mindmap.nodes == [Node('1', 'One'), Node('root', 'root')]
+    assert mindmap.edges == [Edge('root', '1')]
+    assert mindmap.root == 'root'
+    assert len(mindmap.warnings) == 4
+
+
+def test_from_dict_picks_a_root_without_incoming_edges():
+    mindmap = MindMap.from_dict({'nodes': [{'id': 'a'}, {'id': 'b'}], 'edges': [{'from': 'b', 'to': 'a'}]})
+    assert mindmap.root == 'b'
+    with pytest.raises(MindMapError):
+        MindMap.from_dict({'nodes': [{'label': 'no id'}]})
+
+
+def test_extract_salvages_a_truncated_response():
+    graph = synthetic_dag(30)
+    response = model_response(graph)
+    assert extract_graph_data(response) == graph
+    truncated = extract_graph_data(response[:len(response) // 2])
+    assert 0 < len(truncated['nodes']) < len(graph['nodes'])
+    assert truncated['nodes'] == graph['nodes'][:len(truncated['nodes'])]
+    with pytest.raises(MindMapError):
+        extract_graph_data("I cannot help with that.")
@@ -0,0 +1,78 @@
+# frontend/tests/test_layout.py
+"""Tests for the radial layout and its level-of-detail selection."""
+import sys
+
+import numpy as np
+
+from benchmarks.fixtures import synthetic_chain, synthetic_dag, synthetic_tree
+from graph import Edge, MindMap
+from layout import LEVEL_SPACING, radial_layout, visible_rows
+
+
+def graph(edges, extra_nodes=()):
+    ids = dict.fromkeys([node for edge in edges for node in edge] + list(extra_nodes))
+    return {'nodes': [{'id': node_id} for node_id in ids], 'edges': [{'from': a, 'to': b} for a, b in edges]}
+
+
+def test_cycles_and_second_parents_are_dropped_from_the_tree():
+    layout = radial_layout(graph([('root', 'a'), ('a', 'b'), ('b', 'root'), ('root', 'c'), ('c', 'b'), ('b', 'a')]))
+    assert layout.ids == ['root', 'a', 'c', 'b']
+    assert layout.parent.tolist() == [-1, 0, 0, 1]
+    assert layout.dropped_edges == [Edge('c', 'b'), Edge('b', 'root'), Edge('b', 'a')]
+    assert layout.subtree_size.tolist() == [4, 2, 1, 1]
+
+
+def test_unreachable_nodes_are_not_placed():
+    layout = radial_layout(graph([('root', 'a'), ('x', 'y')], extra_nodes=['z']))
+    assert layout.ids == ['root', 'a']
+
+
+def test_chains_deeper_than_the_recursion_limit():
+    depth = sys.getrecursionlimit() + 100
+    layout = radial_layout(synthetic_chain(depth))
+    assert len(layout.ids) == depth + 1
+    assert layout.depth[-1] == depth and layout.subtree_size[0] == depth + 1
+
+
+def test_rows_are_breadth_first_and_children_contiguous():
+    layout = radial_layout(synthetic_dag(500))
+    assert (np.diff(layout.depth) >= 0).all()
+    assert (np.diff(layout.parent) >= 0).all()
+    assert (layout.depth[1:] == layout.depth[layout.parent[1:]] + 1).all()
+    radius = np.hypot(layout.x, layout.y)
+    assert np.allclose(radius, LEVEL_SPACING * layout.depth)
+
+
+def badges(layout, max_depth, expanded=(), max_nodes=None):
+    rows, hidden = visible_rows(layout, max_depth, expanded, max_nodes)
+    return {layout.ids[row]: count for row, count in zip(rows.tolist(), hidden.tolist()) if count}
+
+
+def test_only_collapsed_nodes_report_hidden_descendants():
+    layout = radial_layout(MindMap.from_dict(synthetic_tree(100, fanout=3)))
+    counts = badges(layout, 2)
+    assert counts
+    assert all(layout.depth[layout.index[node_id]] == 2 for node_id in counts)
+    assert sum(counts.values()) == len(layout.ids) - len(visible_rows(layout, 2)[0])
+
+
+def test_expanding_a_collapsed_node_shows_its_children():
+    layout = radial_layout(MindMap.from_dict(synthetic_tree(100, fanout=3)))
+    node_id, count = next(iter(badges(layout, 2).items()))
+    rows, _ = visible_rows(layout, 2, {node_id})
+    assert len(rows) == len(visible_rows(layout, 2)[0]) + min(count, 3)
+    assert node_id not in badges(layout, 2, {node_id})
+
+
+def test_children_cut_by_the_node_limit_can_be_expanded():
+    layout = radial_layout(MindMap.from_dict(synthetic_tree(100, fanout=3)))
+    # The root, its 3 children and the first 2 of 3 grandchildren under '1'
+    rows, _ = visible_rows(layout, 2, max_nodes=6)
+    assert layout.ids[rows[-1]] == '5'
+    counts = badges(layout, 2, max_nodes=6)
+    partial = layout.ids[layout.parent[rows[-1]]]
+    assert counts[partial] == layout.subtree_size[layout.index['6']]
+    assert set(counts) == {partial, '2', '3', '4', '5'}
+    rows, _ = visible_rows(layout, 2, {partial}, max_nodes=6)
+    assert '6' in {layout.ids[row] for row in rows.tolist()}
+    assert partial not in badges(layout, 2, {partial}, max_nodes=6)
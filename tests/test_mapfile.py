@@ -0,0 +1,67 @@
+# frontend/tests/test_mapfile.py
+"""Tests for saving and loading mind map files."""
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import synthetic_dag
+from graph import MindMap
+from layout import radial_layout
+from mapfile import MAX_DOCUMENT_BYTES, MapFileError, dump_mindmap, load_mindmap
+
+
+def document(mindmap):
+    return json.loads(gzip.decompress(dump_mindmap(mindmap)))
+
+
+def test_round_trip_keeps_graph_and_layout():
+    mindmap = MindMap.from_dict(synthetic_dag(300))
+    layout = radial_layout(mindmap)
+    loaded = load_mindmap(dump_mindmap(mindmap, layout, {'source': 'test'}))
+    assert loaded.mindmap.to_dict() == mindmap.to_dict()
+    assert loaded.layout.ids == layout.ids
+    assert np.allclose(loaded.layout.x, layout.x, atol=1e-4)
+    assert (loaded.layout.depth == layout.depth).all()
+    assert (loaded.layout.subtree_size == layout.subtree_size).all()
+    assert loaded.layout.dropped_edges == layout.dropped_edges
+    assert loaded.metadata['source'] == 'test'
+
+
+def test_rejects_oversized_documents():
+    bomb = gzip.compress(b' ' * (MAX_DOCUMENT_BYTES + 1))
+    with pytest.raises(MapFileError, match="larger than"):
+        load_mindmap(bomb)
+
+
+def test_rejects_corrupted_compressed_data():
+    data = bytearray(dump_mindmap(MindMap.from_dict(synthetic_dag(50))))
+    # Past the 10-byte gzip header, before the 8-byte trailer
+    for i in range(20, len(data) - 8, 7):
+        data[i] ^= 0xff
+    with pytest.raises(MapFileError, match="Not a mind map file"):
+        load_mindmap(bytes(data))
+
+
+def test_rejects_truncated_compressed_data():
+    data = dump_mindmap(MindMap.from_dict(synthetic_dag(50)))
+    with pytest.raises(MapFileError, match="ends early"):
+        load_mindmap(data[:len(data) // 2])
+
+
+def test_rejects_float_edge_positions():
+    data = document(MindMap.from_dict(synthetic_dag(20)))
+    data['edges'][0] = float(data['edges'][0]) + 0.5
+    with pytest.raises(MapFileError):
+        load_mindmap(json.dumps(data).encode())
+
+
+def test_recomputes_a_layout_with_a_negative_parent():
+    mindmap = MindMap.from_dict(synthetic_dag(50))
+    data = document(mindmap)
+    data['layout']['parent'][1] = -1
+    loaded = load_mindmap(json.dumps(data).encode())
+    layout = radial_layout(mindmap)
+    assert (loaded.layout.parent == layout.parent).all()
+    assert (loaded.layout.subtree_size == layout.subtree_size).all()
@@ -0,0 +1,71 @@
+# frontend/tests/test_media.py
+"""Tests for decoding uploads through the ffmpeg pipe."""
+import io
+import shutil
+import sys
+import textwrap
+
+import pytest
+from pydub.generators import Sine
+
+import media
+from media import SAMPLE_RATE, SAMPLE_WIDTH, _index_after_media, decode_audio, decode_pcm
+
+# Stands in for ffmpeg: echoes its input, prefixed with where it came from
+ECHO_FFMPEG = textwrap.dedent(f"""\
+    #!{sys.executable}
+    import sys
+    source = sys.argv[sys.argv.index('-i') + 1]
+    if source == 'fail':
+        sys.exit("first line\\nNo audio stream")
+    data = sys.stdin.buffer.read() if source == 'pipe:0' else open(source, 'rb').read()
+    sys.stdout.buffer.write((b'pipe:' if source == 'pipe:0' else b'file:') + data)
+""")
+
+
+def box(kind, payload=b''):
+    return (8 + len(payload)).to_bytes(4, 'big') + kind + payload
+
+
+@pytest.fixture
+def echo_ffmpeg(tmp_path, monkeypatch):
+    path = tmp_path / 'ffmpeg'
+    path.write_text(ECHO_FFMPEG)
+    path.chmod(0o755)
+    monkeypatch.setattr(media, 'FFMPEG', str(path))
+
+
+def test_index_after_media():
+    ftyp = box(b'ftyp', b'isom\0\0\0\0')
+    assert _index_after_media(memoryview(ftyp + box(b'mdat', b'x' * 32) + box(b'moov')))
+    assert not _index_after_media(memoryview(ftyp + box(b'moov') + box(b'mdat', b'x' * 32)))
+    assert not _index_after_media(memoryview(b'ID3' + bytes(64)))
+    # A 64-bit box size in front of the media data
+    large = (1).to_bytes(4, 'big') + b'free' + (24).to_bytes(8, 'big') + bytes(8)
+    assert _index_after_media(memoryview(ftyp + large + box(b'mdat')))
+
+
+def test_small_uploads_are_piped_and_large_ones_spooled(echo_ffmpeg, monkeypatch):
+    data = bytearray(b'audio' * 10)
+    assert decode_pcm(data) == b'pipe:' + data
+    monkeypatch.setattr(media, 'SPOOL_BYTES', 16)
+    assert decode_pcm(data) == b'file:' + data
+    monkeypatch.setattr(media, 'SPOOL_BYTES', 1024)
+    late_index = box(b'ftyp', b'isom') + box(b'mdat', b'x' * 8) + box(b'moov')
+    assert decode_pcm(late_index) == b'file:' + late_index
+
+
+def test_ffmpeg_errors(echo_ffmpeg, monkeypatch):
+    with pytest.raises(ValueError, match="No audio stream"):
+        decode_pcm('fail')
+    monkeypatch.setattr(media, 'FFMPEG', 'no-such-ffmpeg')
+    with pytest.raises(RuntimeError, match="ffmpeg is required"):
+        decode_pcm(b'audio')
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg is not installed")
+def test_decodes_a_wav_upload():
+    tone = Sine(440, sample_rate=44_100).to_audio_segment(duration=1500).set_channels(2)
+    segment = decode_audio(tone.export(io.BytesIO(), format='wav').getvalue())
+    assert (segment.frame_rate, segment.channels, segment.sample_width) == (SAMPLE_RATE, 1, SAMPLE_WIDTH)
+    assert abs(len(segment) - 1500) < 50
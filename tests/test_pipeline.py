@@ -0,0 +1,71 @@
+# frontend/tests/test_pipeline.py
+"""Tests for the batch pipeline's input naming and resume support."""
+import asyncio
+import os
+
+import pytest
+
+import pdf
+from benchmarks.fixtures import fake_completion, lorem_text, make_docx, make_pdf
+from pipeline import MANIFEST, extract_file, find_inputs, load_manifest, run_batch
+
+
+def run(inputs, out_dir):
+    return asyncio.run(run_batch(inputs, str(out_dir), formats=('json',), workers=1, client=fake_completion))
+
+
+def test_same_stem_with_different_extensions_writes_separate_outputs(tmp_path):
+    source = tmp_path / 'in'
+    source.mkdir()
+    (source / 'a.txt').write_text(lorem_text(300))
+    (source / 'a.docx').write_bytes(make_docx(3))
+    inputs = find_inputs([str(source)])
+    assert sorted(name for _, name in inputs) == ['a.docx', 'a.txt']
+
+    out_dir = tmp_path / 'out'
+    assert run(inputs, out_dir) == {'done': 2, 'skipped': 0, 'failed': 0}
+    assert {path.name for path in out_dir.iterdir()} == {'a.txt.json', 'a.docx.json', MANIFEST}
+    assert run(inputs, out_dir) == {'done': 0, 'skipped': 2, 'failed': 0}
+
+
+def test_resume_after_a_truncated_manifest_line(tmp_path):
+    source = tmp_path / 'in'
+    source.mkdir()
+    (source / 'a.txt').write_text(lorem_text(300))
+    (source / 'b.txt').write_text(lorem_text(300, seed=1))
+    inputs = find_inputs([str(source)])
+    out_dir = tmp_path / 'out'
+    run(inputs[:1], out_dir)
+
+    # An interrupted run leaves half a line behind
+    with open(out_dir / MANIFEST, 'a', encoding='utf-8') as f:
+        f.write('{"source": "' + os.path.abspath(inputs[1][0]))
+    assert len(load_manifest(str(out_dir))) == 1
+    assert run(inputs, out_dir) == {'done': 1, 'skipped': 1, 'failed': 0}
+
+
+def test_an_input_removed_after_listing_fails_alone(tmp_path):
+    source = tmp_path / 'in'
+    source.mkdir()
+    (source / 'a.txt').write_text(lorem_text(300))
+    (source / 'b.txt').write_text(lorem_text(300, seed=1))
+    inputs = find_inputs([str(source)])
+    out_dir = tmp_path / 'out'
+    run(inputs, out_dir)
+
+    (source / 'b.txt').unlink()
+    assert run(inputs, out_dir) == {'done': 0, 'skipped': 1, 'failed': 1}
+
+
+def test_pdf_worker_count_is_passed_down(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("started a PDF process pool")
+
+    monkeypatch.setattr(pdf, 'MAX_WORKERS', 4)
+    monkeypatch.setattr(pdf, 'ProcessPoolExecutor', no_pool)
+    path = tmp_path / 'long.pdf'
+    path.write_bytes(make_pdf(pdf.PARALLEL_MIN_PAGES, seed=7))
+    assert extract_file(str(path), pdf_workers=1)
+    path.write_bytes(make_pdf(pdf.PARALLEL_MIN_PAGES, seed=8))
+    with pytest.raises(AssertionError, match="process pool"):
+        extract_file(str(path))
@@ -0,0 +1,72 @@
+# frontend/tests/test_transcription.py
+"""Tests for chunk planning and stitching of parallel transcription."""
+import io
+import threading
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from transcription import SAMPLE_RATE, _stitch, plan_chunks, transcribe_segment
+
+
+def spoken(n_words):
+    """Audio with one 'word' per second: a tone whose frequency encodes its index."""
+    return sum((Sine(200 + 100 * i, sample_rate=SAMPLE_RATE).to_audio_segment(duration=1000)
+                for i in range(1, n_words)), Sine(200, sample_rate=SAMPLE_RATE).to_audio_segment(duration=1000))
+
+
+def tone_backend(wav_bytes):
+    """Recognize the words of ``spoken`` audio, one per whole second."""
+    samples = np.array(AudioSegment.from_wav(io.BytesIO(wav_bytes)).get_array_of_samples(), dtype=float)
+    words = []
+    for start in range(0, len(samples) - SAMPLE_RATE + 1, SAMPLE_RATE):
+        frequency = int(np.abs(np.fft.rfft(samples[start:start + SAMPLE_RATE])).argmax())
+        words.append(f"w{round((frequency - 200) / 100)}")
+    return " ".join(words)
+
+
+def test_stitch_drops_words_repeated_by_the_overlap():
+    parts = ["the quick brown fox", "Brown Fox jumps over", "over the dog", "lazy dog"]
+    assert _stitch(parts, [False, True, True, False]) == "the quick brown fox jumps over the dog lazy dog"
+
+
+def test_stitch_keeps_everything_without_a_common_run():
+    assert _stitch(["a b c", "d e"], [False, True]) == "a b c d e"
+    assert _stitch(["", "a b", "b c"], [False, True, True]) == "a b c"
+
+
+def test_plan_cuts_at_pauses_and_overlaps_otherwise():
+    tone = Sine(440, sample_rate=SAMPLE_RATE).to_audio_segment(duration=5000)
+    assert plan_chunks(tone + AudioSegment.silent(1000, SAMPLE_RATE) + tone, chunk_ms=8000) == [
+        (0, 5500, False), (5500, 11000, False)]
+    assert plan_chunks(spoken(20), chunk_ms=8000) == [(0, 8000, False), (6000, 14000, True), (12000, 20000, True)]
+
+
+def test_transcribe_stitches_overlapping_chunks_in_order():
+    text = transcribe_segment(spoken(20), backend=tone_backend, chunk_ms=8000)
+    assert text == " ".join(f"w{i}" for i in range(20))
+
+
+def test_transcribe_retries_a_failed_chunk():
+    failed = []
+    lock = threading.Lock()
+
+    def flaky(wav_bytes):
+        with lock:
+            if not failed:
+                failed.append(True)
+                raise ConnectionError("dropped")
+        return tone_backend(wav_bytes)
+
+    text = transcribe_segment(spoken(20), backend=flaky, chunk_ms=8000, backoff=0)
+    assert text == " ".join(f"w{i}" for i in range(20))
+
+
+def test_transcribe_raises_once_retries_are_used_up():
+    def offline(wav_bytes):
+        raise ConnectionError("offline")
+
+    with pytest.raises(ConnectionError):
+        transcribe_segment(spoken(20), backend=offline, chunk_ms=8000, retries=1, backoff=0)
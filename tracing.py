@@ -0,0 +1,190 @@
+# frontend/tracing.py
+"""
+Lightweight per-stage tracing of the generation pipeline.
+
+Each stage (extraction, OCR, transcription, the model call, parsing,
+layout, figure building, export) runs inside ``span``. Each span records
+the wall time, the CPU time, the process's peak RSS and the input sizes
+the stage reports. A finished span is:
+
+* appended to the list of every active ``collect`` block in the same
+  context, which is how the app shows the spans of one run;
+* written as one JSON line to ``LIGHTNINGROUTE_TRACE_LOG``;
+* added to per-stage totals written in Prometheus text format to
+  ``LIGHTNINGROUTE_METRICS_FILE``, for a node_exporter textfile collector.
+
+CPU time is process-wide, so stages that fan out to threads include their
+workers. Peak RSS is the high-water mark of the process at the end of the
+stage, not the stage's own allocation.
+
+Environment:
+    LIGHTNINGROUTE_TRACE_LOG: JSON lines file spans are appended to
+    LIGHTNINGROUTE_METRICS_FILE: Prometheus text file rewritten after
+        every span
+    LIGHTNINGROUTE_DEBUG_PANEL: "1" to show the spans of the last run in
+        the app sidebar
+"""
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+TRACE_LOG = os.environ.get('LIGHTNINGROUTE_TRACE_LOG') or None
+METRICS_FILE = os.environ.get('LIGHTNINGROUTE_METRICS_FILE') or None
+DEBUG_PANEL = os.environ.get('LIGHTNINGROUTE_DEBUG_PANEL', '0') == '1'
+
+Span = namedtuple('Span', ['stage', 'started_at', 'wall', 'cpu', 'peak_rss', 'sizes', 'error'])
+Span.__doc__ = """
+Measurements of one pipeline stage.
+
+Attributes:
+    stage (str): Stage name, e.g. 'extract' or 'llm'
+    started_at (float): Unix time the stage started
+    wall (float): Elapsed seconds
+    cpu (float): Process CPU seconds
+    peak_rss (int): Peak resident set size of the process in bytes, or None
+        where the platform does not report it
+    sizes (dict): Input and output sizes reported by the stage
+    error (str): Exception type name if the stage failed, else None
+"""
+
+logger = logging.getLogger(__name__)
+
+_collectors = contextvars.ContextVar('lightningroute_trace_collectors', default=())
+_lock = threading.Lock()
+# stage -> [runs, errors, wall seconds, CPU seconds]
+_totals = {}
+
+
+def _peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@contextmanager
+def span(stage, **sizes):
+    """
+    Measure one pipeline stage.
+
+    The stage can add sizes it only knows at the end to the yielded dict.
+
+    Args:
+        stage (str): Stage name
+        **sizes: Input sizes known up front, e.g. ``chars=len(text)``
+
+    Yields:
+        dict: The sizes recorded with the span
+    """
+    started_at = time.time()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    error = None
+    try:
+        yield sizes
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _finish(Span(stage, started_at, time.perf_counter() - wall, time.process_time() - cpu,
+                     _peak_rss(), sizes, error))
+
+
+@contextmanager
+def collect():
+    """
+    Collect the spans finished in the current context.
+
+    Yields:
+        list: Spans in the order they finished
+    """
+    spans = []
+    token = _collectors.set(_collectors.get() + (spans,))
+    try:
+        yield spans
+    finally:
+        _collectors.reset(token)
+
+
+def start_collecting():
+    """
+    Collect the spans finished in the current context from now on.
+
+    For scripts whose work cannot sit in one ``collect`` block, such as the
+    Streamlit app. Replaces collectors started earlier in the same context.
+
+    Returns:
+        list: Spans in the order they finish
+    """
+    spans = []
+    _collectors.set((spans,))
+    return spans
+
+
+def propagate(func):
+    """
+    Bind ``func`` to the current context, so spans it finishes on a worker
+    thread reach the active ``collect`` blocks.
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(func, *args, **kwargs)
+
+
+def _finish(record):
+    for spans in _collectors.get():
+        spans.append(record)
+    with _lock:
+        totals = _totals.setdefault(record.stage, [0, 0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += record.error is not None
+        totals[2] += record.wall
+        totals[3] += record.cpu
+    if TRACE_LOG is None and METRICS_FILE is None:
+        return
+    try:
+        with _lock:
+            if TRACE_LOG is not None:
+                with open(TRACE_LOG, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record._asdict(), default=str) + '\n')
+            if METRICS_FILE is not None:
+                _write_metrics(record.peak_rss)
+    except OSError:
+        logger.warning("Could not write trace output", exc_info=True)
+
+
+def prometheus_text(peak_rss=None):
+    """Return the per-stage totals of this process in Prometheus text exposition format."""
+    lines = []
+    metrics = (
+        ('lightningroute_stage_runs_total', 'counter', 'Completed runs of a pipeline stage', 0),
+        ('lightningroute_stage_errors_total', 'counter', 'Runs of a pipeline stage that raised', 1),
+        ('lightningroute_stage_wall_seconds_total', 'counter', 'Wall time spent in a pipeline stage', 2),
+        ('lightningroute_stage_cpu_seconds_total', 'counter', 'Process CPU time spent in a pipeline stage', 3),
+    )
+    for name, kind, help_text, column in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage in sorted(_totals):
+            lines.append(f'{name}{{stage="{stage}"}} {_totals[stage][column]}')
+    if peak_rss is not None:
+        lines.append("# HELP lightningroute_process_peak_rss_bytes Peak resident set size of the process")
+        lines.append("# TYPE lightningroute_process_peak_rss_bytes gauge")
+        lines.append(f"lightningroute_process_peak_rss_bytes {peak_rss}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_metrics(peak_rss):
+    tmp_path = f"{METRICS_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(peak_rss))
+    # Scrapers never see a half-written file
+    os.replace(tmp_path, METRICS_FILE)
@@ -0,0 +1,187 @@
+# frontend/transcription.py
+"""
+Chunked, parallel speech transcription.
+
+Long recordings are cut into chunks of about ``CHUNK_MS``, preferably at a
+pause in speech and otherwise with a short overlap. The chunks are
+transcribed concurrently in a bounded thread pool, retried one by one on
+failure and stitched back together in order.
+
+The speech backend is any callable taking 16 kHz mono WAV bytes and
+returning the recognized text ("" for no speech), so tests can pass a
+local stub instead of the Google Web Speech API.
+
+Environment:
+    LIGHTNINGROUTE_TRANSCRIBE_WORKERS: Concurrent recognition requests
+        (default 4)
+"""
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import deps
+import tracing
+
+CHUNK_MS = 60_000
+SILENCE_SEARCH_MS = 10_000
+MIN_SILENCE_MS = 400
+OVERLAP_MS = 2_000
+SAMPLE_RATE = 16_000
+MAX_WORKERS = max(1, int(os.environ.get('LIGHTNINGROUTE_TRANSCRIBE_WORKERS', '4')))
+
+logger = logging.getLogger(__name__)
+
+
+def google_backend(wav_bytes):
+    """Recognize speech in WAV bytes with the Google Web Speech API."""
+    sr = deps.load('speech_recognition')
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+        audio_data = recognizer.record(source)
+    try:
+        return recognizer.recognize_google(audio_data)
+    except sr.UnknownValueError:
+        return ""
+    except sr.RequestError as e:
+        raise ConnectionError("Unable to connect Google API") from e
+
+
+def plan_chunks(segment, chunk_ms=CHUNK_MS):
+    """
+    Choose chunk boundaries for an audio segment.
+
+    Each cut is placed in the middle of the last pause found in the final
+    ``SILENCE_SEARCH_MS`` of the chunk. Without a pause the chunk is cut
+    at ``chunk_ms`` and the next chunk starts ``OVERLAP_MS`` earlier so no
+    word is lost at the boundary.
+
+    Args:
+        segment (pydub.AudioSegment): Audio to split
+        chunk_ms (int): Target chunk length in milliseconds
+
+    Returns:
+        list: ``(start_ms, end_ms, overlaps_previous)`` tuples in order
+    """
+    detect_silence = deps.load('pydub.silence').detect_silence
+
+    total = len(segment)
+    chunks = []
+    start = 0
+    overlaps = False
+    silence_thresh = segment.dBFS - 16
+    while start < total:
+        end = start + chunk_ms
+        if end >= total:
+            chunks.append((start, total, overlaps))
+            break
+        window_start = max(start, end - SILENCE_SEARCH_MS)
+        silences = detect_silence(segment[window_start:end], min_silence_len=MIN_SILENCE_MS,
+                                  silence_thresh=silence_thresh)
+        if silences:
+            silence_start, silence_end = silences[-1]
+            cut = window_start + (silence_start + silence_end) // 2
+            chunks.append((start, cut, overlaps))
+            start, overlaps = cut, False
+        else:
+            chunks.append((start, end, overlaps))
+            start, overlaps = end - OVERLAP_MS, True
+    return chunks
+
+
+def _to_wav(segment):
+    buffer = io.BytesIO()
+    segment.set_frame_rate(SAMPLE_RATE).set_channels(1).export(buffer, format="wav")
+    return buffer.getvalue()
+
+
+def _recognize_with_retry(backend, wav_bytes, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return backend(wav_bytes)
+        except Exception:
+            if attempt == retries:
+                raise
+            logger.warning("Transcription chunk failed, retrying (%d/%d)", attempt + 1, retries, exc_info=True)
+            time.sleep(backoff * 2 ** attempt)
+
+
+def _stitch(parts, overlaps, max_overlap_words=20):
+    words = []
+    for text, overlapped in zip(parts, overlaps):
+        new_words = text.split()
+        if overlapped and words:
+            # Drop the words repeated by the overlap with the previous chunk
+            limit = min(max_overlap_words, len(words), len(new_words))
+            for k in range(limit, 0, -1):
+                if [w.lower() for w in words[-k:]] == [w.lower() for w in new_words[:k]]:
+                    new_words = new_words[k:]
+                    break
+        words.extend(new_words)
+    return " ".join(words)
+
+
+def transcribe_segment(segment, backend=None, max_workers=MAX_WORKERS, retries=2, backoff=1.0,
+                       chunk_ms=CHUNK_MS, progress=None):
+    """
+    Transcribe an audio segment chunk by chunk.
+
+    Args:
+        segment (pydub.AudioSegment): Audio to transcribe
+        backend (callable): ``backend(wav_bytes) -> str``; defaults to ``google_backend``
+        max_workers (int): Maximum concurrent backend calls
+        retries (int): Extra attempts per failed chunk
+        backoff (float): Seconds before the first retry, doubled each time
+        chunk_ms (int): Target chunk length in milliseconds
+        progress (callable): Optional ``progress(fraction)`` callback
+
+    Returns:
+        str: Transcript of the whole segment
+
+    Raises:
+        ValueError: If no speech is recognized in any chunk
+    """
+    backend = backend or google_backend
+    with tracing.span('transcribe', audio_seconds=len(segment) / 1000) as sizes:
+        text = _transcribe_chunks(segment, backend, max_workers, retries, backoff, chunk_ms, progress, sizes)
+    if not text:
+        raise ValueError("Cannot recognize the audio")
+    return text
+
+
+def _transcribe_chunks(segment, backend, max_workers, retries, backoff, chunk_ms, progress, sizes):
+    chunks = plan_chunks(segment, chunk_ms)
+    sizes['chunks'] = len(chunks)
+
+    def transcribe_chunk(chunk):
+        start, end, _ = chunk
+        return _recognize_with_retry(backend, _to_wav(segment[start:end]), retries, backoff)
+
+    # Progress is reported from the calling thread, which Streamlit requires
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcribe") as pool:
+        futures = [pool.submit(transcribe_chunk, chunk) for chunk in chunks]
+        for done, _ in enumerate(as_completed(futures), 1):
+            if progress:
+                progress(done / len(chunks))
+        parts = [future.result() for future in futures]
+
+    text = _stitch(parts, [overlaps for _, _, overlaps in chunks])
+    sizes['chars'] = len(text)
+    return text
+
+
+def transcribe_file(source, work_dir=None, **kwargs):
+    """
+    Transcribe an audio or video file readable by ffmpeg.
+
+    Args:
+        source: Path, or file contents as a bytes-like object
+        work_dir (str): Directory for a spooled copy of large uploads
+        **kwargs: Passed to ``transcribe_segment``
+
+    Returns:
+        str: Transcript of the audio track
+    """
+    from media import decode_audio
+    return transcribe_segment(decode_audio(source, SAMPLE_RATE, work_dir), **kwargs)
@@ -1,90 +1,115 @@
 # frontend/utils.py
-import plotly.graph_objects as go
-import numpy as np
-import sys
+import deps
+import tracing
+from graph import as_mindmap
+from layout import radial_layout, visible_rows
 
-sys.setrecursionlimit(100000)
+# Above this many nodes the figure switches to WebGL traces
+WEBGL_NODE_THRESHOLD = 1000
 
-def create_mindmap_figure(graph_data):
+
+def _edge_coordinates(coords, node_index, edges):
     """
-    Create an interactive mind map visualization using Plotly with radial tree layout.
+    Build the coordinate arrays for all edges as one polyline.
+    
+    Each edge contributes its two endpoints followed by a NaN separator,
+    which Plotly treats like ``None`` and draws as a break in the line, so
+    a single trace renders every edge.
     
     Args:
-        graph_data (dict): Dictionary containing nodes and edges data
+        coords (numpy.ndarray): (n, 2) array of node positions
+        node_index (dict): Mapping of node id to row in ``coords``
+        edges (list): ``Edge`` records between positioned nodes
         
     Returns:
-        plotly.graph_objects.Figure: Interactive mind map figure
+        tuple: Flat x and y arrays of length ``3 * len(edges)``
     """
+    np = deps.load('numpy')
+    src = np.fromiter((node_index[edge.source] for edge in edges), dtype=np.intp, count=len(edges))
+    dst = np.fromiter((node_index[edge.target] for edge in edges), dtype=np.intp, count=len(edges))
+    
+    segments = np.full((len(edges), 3, 2), np.nan)
+    segments[:, 0] = coords[src]
+    segments[:, 1] = coords[dst]
+    return segments[:, :, 0].ravel(), segments[:, :, 1].ravel()
+
+
+def create_mindmap_figure(graph_data, layout=None, max_depth=None, expanded=(), max_nodes=None):
+    """
+    Create an interactive mind map visualization using Plotly with radial tree layout.
     
-    # Extract nodes and edges
-    nodes = graph_data['nodes']
-    edges = graph_data['edges']
-    
-    # Find root node and create node dictionary
-    node_dict = {node['id']: node for node in nodes}
-    edge_dict = {}
-    for edge in edges:
-        if edge['from'] not in edge_dict:
-            edge_dict[edge['from']] = []
-        edge_dict[edge['from']].append(edge['to'])
-    
-    # Create node positions using radial tree layout
-    pos = {}
-    def assign_positions(node_id, angle_range, level, parent_x=0, parent_y=0):
-        start_angle, end_angle = angle_range
-        children = edge_dict.get(node_id, [])
-        radius = 1.5 * level
-        
-        # Position current node
-        angle = (start_angle + end_angle) / 2
-        x = radius * np.cos(angle)
-        y = radius * np.sin(angle)
-        pos[node_id] = (x, y)
-        
-        # Position children
-        if children:
-            angle_step = (end_angle - start_angle) / len(children)
-            for i, child in enumerate(children):
-                child_start = start_angle + i * angle_step
-                child_end = child_start + angle_step
-                assign_positions(child, (child_start, child_end), level + 1, x, y)
-    
-    # Start layout from root node
-    root_id = 'root'  # Assuming 'root' is always the root node
-    assign_positions(root_id, (0, 2 * np.pi), 0)
+    Passing ``max_depth`` or ``max_nodes`` draws a level-of-detail view:
+    only part of the tree is drawn, nodes with hidden children are
+    drawn larger with a "(+N)" badge, and every node carries its id in
+    ``customdata`` so a click can expand it. Positions come from the layout
+    of the whole map, so expanding a subtree only adds nodes.
     
-    # Create edge traces
-    edge_traces = []
-    for edge in edges:
-        x0, y0 = pos[edge['from']]
-        x1, y1 = pos[edge['to']]
+    Args:
+        graph_data (MindMap or dict): Mind map, or a dictionary containing
+            nodes and edges data
+        layout (RadialLayout): Layout of ``graph_data`` to reuse; computed
+            when None
+        max_depth (int): Deepest level drawn without expanding; None for all
+        expanded (iterable): Ids of nodes whose children are drawn
+            regardless of ``max_depth``
+        max_nodes (int): Maximum number of nodes drawn; None for no limit
         
-        # Create curved edges
-        edge_trace = go.Scatter(
-            x=[x0, x1],
-            y=[y0, y1],  # Add slight curve
-            line=dict(width=1, color='#888'),
-        )
-        edge_traces.append(edge_trace)
+    Returns:
+        plotly.graph_objects.Figure: Interactive mind map figure
+    """
+    mindmap = as_mindmap(graph_data)
+    with tracing.span('figure', nodes=len(mindmap.nodes), edges=len(mindmap.edges)) as sizes:
+        return _build_figure(mindmap, layout or radial_layout(mindmap), max_depth, expanded, max_nodes, sizes)
+
+
+def _build_figure(mindmap, layout, max_depth, expanded, max_nodes, sizes):
+    np = deps.load('numpy')
+    go = deps.load('plotly')
+
+    # Select the nodes to draw; positions are those of the full layout
+    if max_depth is None and max_nodes is None:
+        ids, index, x, y, hidden = layout.ids, layout.index, layout.x, layout.y, None
+    else:
+        rows, hidden = visible_rows(layout, max_depth, expanded, max_nodes)
+        ids = [layout.ids[row] for row in rows.tolist()]
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        x, y = layout.x[rows], layout.y[rows]
+    sizes['drawn_nodes'] = len(ids)
+    coords = np.column_stack((x, y))
+    
+    # Create edge trace, skipping edges to nodes that are not drawn
+    edges = [edge for edge in mindmap.edges
+             if edge.source in index and edge.target in index]
+    edge_x, edge_y = _edge_coordinates(coords, index, edges)
+    scatter = go.Scattergl if len(ids) > WEBGL_NODE_THRESHOLD else go.Scatter
+    edge_trace = scatter(
+        x=edge_x,
+        y=edge_y,
+        mode='lines',
+        line=dict(width=1, color='#888'),
+        hoverinfo='skip'
+    )
     
     # Create node traces
-    node_x, node_y, node_text, node_colors = [], [], [], []
-    for node_id, (x, y) in pos.items():
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(node_dict[node_id]['label'])  # Use node labels
-        node_colors.append('#ff7f0e' if node_id == 'root' else '#1f77b4')
+    node_text = [mindmap.label(node_id) for node_id in ids]  # Use node labels
+    node_colors = ['#ff7f0e' if node_id == mindmap.root else '#1f77b4' for node_id in ids]
+    marker_size = 10
+    if hidden is not None:
+        # Badges for collapsed subtrees
+        node_text = [f"{text} (+{count})" if count else text for text, count in zip(node_text, hidden.tolist())]
+        marker_size = np.where(hidden > 0, 16, 10)
 
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
+    node_trace = scatter(
+        x=x, y=y,
         mode="markers+text",
-        marker=dict(size=10, color=node_colors, line=dict(width=1, color="black")),
+        marker=dict(size=marker_size, color=node_colors, line=dict(width=1, color="black")),
         text=node_text,
+        customdata=None if hidden is None else ids,
         textposition="top center"
     )
     
     # Create figure
-    fig = go.Figure([*edge_traces, node_trace])
+    fig = go.Figure([edge_trace, node_trace])
     fig.update_layout(
         showlegend=False,
         margin=dict(l=20, r=20, t=20, b=20),
@@ -93,66 +118,3 @@ def create_mindmap_figure(graph_data):
     )
     
     return fig
-    
-    # Create edge traces
-    edge_traces = []
-    for edge in edges:
-        x0, y0 = pos[edge['from']]
-        x1, y1 = pos[edge['to']]
-        
-        edge_trace = go.Scatter(
-            x=[x0, x1],
-            y=[y0, y1],
-            line=dict(width=1, color='#888'),
-            hoverinfo='none',
-            mode='lines'
-        )
-        edge_traces.append(edge_trace)
-    
-    # Create node trace
-    node_x = []
-    node_y = []
-    node_text = []
-    
-    for node in nodes:
-        x, y = pos[node['id']]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(node['label'])
-    
-    node_trace = go.Scatter(
-        x=node_x,
-        y=node_y,
-        mode='markers+text',
-        hoverinfo='text',
-        text=node_text,
-        textposition="top center",
-        textfont=dict(color="white"),
-        marker=dict(
-            size=20,
-            color='#1f77b4',
-            line_width=2
-        )
-    )
-    
-    # Create figure
-    fig = go.Figure(
-        data=[*edge_traces, node_trace],
-        layout=go.Layout(
-            showlegend=False,
-            hovermode='closest',
-            margin=dict(b=0, l=0, r=0, t=0),
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            plot_bgcolor="black",
-            paper_bgcolor="white"
-        )
-    )
-    
-    # Update layout for better interactivity
-    fig.update_layout(
-        dragmode='pan',
-        clickmode='event+select'
-    )
-    
-    return fig
@@ -0,0 +1,82 @@
+# frontend/video.py
+"""
+Download and transcribe the audio of a video URL.
+
+Transcripts are cached by URL, so one video costs one download and one
+transcription no matter how many Streamlit reruns or sessions ask for it.
+"""
+import os
+import tempfile
+
+import deps
+import tracing
+from cache import content_key, text_cache
+
+TRANSCRIBER_VERSION = 3
+
+
+def _transcript_key(url):
+    return content_key('video-url', str(TRANSCRIBER_VERSION), url.strip())
+
+
+def cached_transcript(url):
+    """Return the transcript of ``url`` if it was already fetched, else None."""
+    return text_cache.get(_transcript_key(url))
+
+
+def transcribe_video_url(url, progress=None, work_dir=None):
+    """
+    Return the transcript of a video, downloading it only on a cache miss.
+
+    Args:
+        url (str): Full video URL supported by yt-dlp
+        progress (callable): Optional ``progress(fraction, message)`` callback
+        work_dir (str): Directory for the downloaded audio; defaults to the
+            system temporary directory
+
+    Returns:
+        str: Recognized speech
+
+    Raises:
+        ValueError: If the URL is empty or the audio cannot be recognized
+        ConnectionError: If the speech recognition service is unreachable
+    """
+    url = url.strip()
+    if not url:
+        raise ValueError("Please enter a video URL")
+    report = progress or (lambda fraction, message: None)
+    return text_cache.get_or_compute(_transcript_key(url), lambda: _download_and_transcribe(url, report, work_dir))
+
+
+def _download_and_transcribe(url, report, work_dir):
+    yt_dlp = deps.load('yt_dlp')
+    from transcription import transcribe_file
+
+    def on_download(status):
+        if status['status'] == 'downloading':
+            total = status.get('total_bytes') or status.get('total_bytes_estimate')
+            if total:
+                report(0.6 * status['downloaded_bytes'] / total, "Downloading audio...")
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        # The audio stream is kept in its original codec; transcription
+        # decodes it with ffmpeg anyway, so an MP3 re-encode would be wasted
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'outtmpl': os.path.join(tmp_dir, 'audio.%(ext)s'),
+            'progress_hooks': [on_download],
+            'quiet': True,
+        }
+        report(0.0, "Downloading audio...")
+        with tracing.span('download') as sizes, yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            audio_path = ydl.prepare_filename(ydl.extract_info(url, download=True))
+            sizes['bytes'] = os.path.getsize(audio_path)
+
+        report(0.6, "Converting audio to text...")
+        text = transcribe_file(
+            audio_path,
+            progress=lambda fraction: report(0.6 + 0.4 * fraction, "Converting audio to text...")
+        )
+
+    report(1.0, "Done")
+    return text